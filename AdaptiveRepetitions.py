@@ -0,0 +1,30 @@
+from typing import Sequence
+import numpy as np
+
+
+def get_required_repetitions_count(repetitions_count: int, standard_errors: Sequence[float],
+                                   standard_error_targets: Sequence[float], max_repetitions_count: int) -> int:
+    """
+    The number of repetitions a configuration needs for the standard errors of its results to drop below their targets,
+    estimated from the repetitions done so far, as the standard error shrinks with the square root of the number of
+    repetitions. Noisy configurations therefore get more repetitions than stable ones.
+    :param repetitions_count: The number of repetitions done so far.
+    :param standard_errors: The standard errors of the results across these repetitions.
+    :param standard_error_targets: A positive target for each of the standard errors.
+    :param max_repetitions_count: The cap on the number of repetitions.
+    :return: repetitions_count if the configuration needs no more repetitions, or a larger number up to the cap.
+    """
+    if repetitions_count >= max_repetitions_count:
+        return repetitions_count
+    if repetitions_count < 2:
+        # There is no standard error of a single repetition.
+        return 2
+
+    required_repetitions_count = repetitions_count
+    for standard_error, standard_error_target in zip(standard_errors, standard_error_targets):
+        if standard_error_target <= 0:
+            raise ValueError("Standard error target must be positive: ", standard_error_target)
+        if standard_error > standard_error_target:
+            required_repetitions_count = max(required_repetitions_count, repetitions_count + 1, int(np.ceil(
+                repetitions_count * (standard_error / standard_error_target) ** 2)))
+    return min(required_repetitions_count, max_repetitions_count)
@@ -0,0 +1,112 @@
+from typing import List, Tuple, Sequence, Dict
+from LightningNetwork import LightningNetworkConfiguration
+from ArrayLightningNetwork import ArrayLightningNetwork, ArrayPath
+import numpy as np
+import sys
+
+
+class AnalyticLightningNetwork(ArrayLightningNetwork):
+    """
+    Lightning Network for the liquidity-assumed mode, where transactions never fail and the channel balances never
+    constrain them, so the network keeps no channel state at all.
+
+    A relay receives the value of the hop into it and sends the value of the hop out of it, which is smaller by the fee
+    it deducted, so a transaction only changes the balance of each relay in its path by that fee. The network samples
+    the paths as ArrayLightningNetwork does, and adds the fees to the relays balance ledger with scatter-adds.
+    """
+    def __init__(self, configuration: LightningNetworkConfiguration, random_generator: np.random.Generator = None):
+        """
+
+        :param configuration: Must assume liquidity.
+        :param random_generator:
+        """
+        if not configuration.is_liquidity_assumed:
+            raise ValueError("The analytic engine only simulates networks where liquidity is assumed")
+        super().__init__(configuration, random_generator)
+
+    def create_relays(self) -> range:
+        """
+        :return: Relays, which have a channel with every other relay.
+        """
+        # Relay i pays the channel cost of its channels with the i relays created before it, and its balance in each of
+        # its channels is still its own, so that cost is all it loses.
+        creation_order = np.arange(self.configuration.number_of_relays, dtype=np.float64)
+        self.relays_balance: np.ndarray = -creation_order * self.configuration.channel_cost
+        self.channel_balances: np.ndarray = np.empty(0, dtype=np.float64)
+        return range(self.configuration.number_of_relays)
+
+    def create_clients(self) -> range:
+        """
+        :return: Clients, connected to bootstrap relays. The balance the relay keeps in the channel is still its own,
+         so connecting a client doesn't change it.
+        """
+        number_of_clients: int = self.configuration.number_of_clients
+        relays_per_client: int = self.configuration.number_of_relays_per_client
+
+        self.client_channel_relays: np.ndarray = self.sample_distinct_relays(
+            np.empty((number_of_clients, 0), dtype=np.int64), relays_per_client
+        ).reshape(number_of_clients * relays_per_client)
+        return range(number_of_clients)
+
+    def calculate_relays_balances(self) -> List[float]:
+        """
+
+        :return:
+        """
+        return self.relays_balance.tolist()
+
+    def transfer_along_path(self, path: ArrayPath, hop_values: List[float], hop_fees: List[float]):
+        """
+        Add the fee every relay in the path deducted to its balance, and collect the fees.
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :param hop_fees: See calculate_hop_schedule.
+        :return:
+        """
+        relays: List[int] = path[1]
+        for relay, fees in zip(relays, hop_fees):
+            self.relays_balance_ledger.add(relay, fees)
+
+        # The fees of the last hop, after the last relay, shouldn't be collected, as in ArrayLightningNetwork.
+        sum_relays_balances: float = self.sum_relays_balances
+        for fees in hop_fees:
+            sum_relays_balances += fees
+        self.sum_relays_balances = sum_relays_balances - hop_fees[-1]
+
+    def transact_batch(self, transaction_values: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw the paths of all the transactions at once, and add the fees of every relay in them to the ledger with a
+        single scatter-add.
+        :param transaction_values:
+        :return: Whether each transaction succeeded, which they all did, and the relays mean balance after each
+         transaction.
+        """
+        values = np.asarray(transaction_values, dtype=np.float64)
+        if self.configuration.add_fees_to_value:
+            values = self.calculate_value_with_cumulative_fees(values)
+        if np.any(values < 0):
+            raise ValueError("Tried to send negative value: ", values[values < 0][0])
+
+        relays = self.sample_paths(len(values))[1]
+        hop_fees = self.calculate_hop_values(values)[1]
+        self.relays_balance_ledger.add_at(relays, hop_fees[:, :relays.shape[1]])
+
+        # The fees of each transaction are accumulated hop by hop, and the fees of the last hop shouldn't be collected,
+        # as in ArrayLightningNetwork.
+        fees_increments = np.column_stack((hop_fees, -hop_fees[:, -1]))
+        sums_relays_balances = np.cumsum(np.concatenate(([self.sum_relays_balances], fees_increments.ravel())))
+        sums_relays_balances = sums_relays_balances[fees_increments.shape[1]::fees_increments.shape[1]]
+        if len(values) > 0:
+            self.sum_relays_balances = float(sums_relays_balances[-1])
+
+        return np.ones(len(values), dtype=bool), sums_relays_balances / len(self.relays)
+
+    def get_memory_report(self) -> Dict[str, float]:
+        """
+        :return: The memory footprint of the network, which has no channel balances.
+        """
+        number_of_relays: int = len(self.relays)
+        nodes_bytes: int = self.relays_balance.nbytes + self.relays_balance_ledger.get_balances().nbytes
+        channels_count: int = number_of_relays * (number_of_relays - 1) // 2 + len(self.client_channel_relays)
+        return self.create_memory_report(number_of_relays + len(self.clients), nodes_bytes, channels_count,
+                                         self.client_channel_relays.nbytes, sys.getsizeof(self.fail_histogram))
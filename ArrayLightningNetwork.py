@@ -0,0 +1,571 @@
+from typing import List, Tuple, Sequence, Dict, Optional
+from LightningNetwork import LightningNetwork, LightningNetworkConfiguration, FIRST_ATTEMPT_FAILURES, RETRIES
+from RelaysBalanceLedger import RelaysBalanceLedger
+from LiquidityIndex import LiquidityIndex
+import numpy as np
+import sys
+
+# A path in the array engine: (source client channel, relays in the path, target client channel).
+ArrayPath = Tuple[int, List[int], int]
+# A batch of paths: (source client channels, relays in each path as rows, target client channels).
+ArrayPaths = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class ArrayLightningNetwork(LightningNetwork):
+    """
+    Lightning Network whose nodes are integer IDs and whose channel balances are kept in NumPy arrays.
+
+    Relays are numbered 0..R-1 in creation order and clients 0..C-1. The balance relay i holds in its channel with
+    relay j is relay_channel_balances[i, j]. Client channels are numbered client * NUMBER_OF_RELAYS_PER_CLIENT + slot,
+    where slot is the position of the relay among the client's bootstrap relays. The balance arrays of all the channels
+    are views of the single channel_balances array, so snapshot and restore copy them at once.
+    """
+    def __init__(self, configuration: LightningNetworkConfiguration, random_generator: np.random.Generator = None):
+        """
+
+        :param configuration:
+        :param random_generator:
+        """
+        super().__init__(configuration, random_generator)
+        self.liquidity_index: LiquidityIndex = None
+        if configuration.max_payment_attempts > 1 and not configuration.is_liquidity_assumed:
+            self.liquidity_index = LiquidityIndex(self.relay_channel_balances)
+
+    def create_relays(self) -> range:
+        """
+        :return: Full-graph of Relays, with the balances of the relay-relay channels in a dense directional matrix.
+        """
+        number_of_relays: int = self.configuration.number_of_relays
+        channel_balance: float = self.configuration.default_balance_relay_relay_channel
+        client_channels_count: int = \
+            self.configuration.number_of_clients * self.configuration.number_of_relays_per_client
+
+        self.channel_balances: np.ndarray = np.empty(number_of_relays * number_of_relays + 2 * client_channels_count,
+                                                     dtype=np.float64)
+        self.relay_channel_balances: np.ndarray = \
+            self.channel_balances[:number_of_relays * number_of_relays].reshape(number_of_relays, number_of_relays)
+        self.relay_channel_balances.fill(channel_balance)
+        np.fill_diagonal(self.relay_channel_balances, 0)
+
+        # Relay i creates channels with the i relays created before it and pays their channel cost, the relays created
+        # after it create channels with it.
+        creation_order = np.arange(number_of_relays, dtype=np.float64)
+        self.relays_balance: np.ndarray = -(creation_order * (channel_balance + self.configuration.channel_cost)
+                                            + (number_of_relays - 1 - creation_order) * channel_balance)
+        return range(number_of_relays)
+
+    def create_clients(self) -> range:
+        """
+        :return: Network clients, based on the network configuration, connected to bootstrap relays with channels.
+        """
+        number_of_clients: int = self.configuration.number_of_clients
+        relays_per_client: int = self.configuration.number_of_relays_per_client
+        client_balance: float = self.configuration.default_balance_client_relay_channel_client
+        relay_balance: float = self.configuration.default_balance_client_relay_channel_relay
+
+        self.client_channel_relays: np.ndarray = self.sample_distinct_relays(
+            np.empty((number_of_clients, 0), dtype=np.int64), relays_per_client
+        ).reshape(number_of_clients * relays_per_client)
+        client_channels_count: int = number_of_clients * relays_per_client
+        # The client channels are at the end of channel_balances, after the relay channels.
+        client_channels_start: int = len(self.channel_balances) - 2 * client_channels_count
+        self.client_channel_balances: np.ndarray = \
+            self.channel_balances[client_channels_start:client_channels_start + client_channels_count]
+        self.client_channel_balances.fill(client_balance)
+        self.relay_client_channel_balances: np.ndarray = \
+            self.channel_balances[client_channels_start + client_channels_count:]
+        self.relay_client_channel_balances.fill(relay_balance)
+
+        # The client is the channel creator, so it pays for the channel cost.
+        self.clients_balance: np.ndarray = np.full(number_of_clients,
+                                                   -(client_balance + self.configuration.channel_cost) *
+                                                   relays_per_client, dtype=np.float64)
+        self.relays_balance -= np.bincount(self.client_channel_relays, minlength=len(self.relays)) * relay_balance
+        return range(number_of_clients)
+
+    def transact(self, source_client: int, target_client: int, value: float) -> bool:
+        """
+
+        :param source_client:
+        :param target_client:
+        :param value:
+        :return:
+        """
+        if self.configuration.add_fees_to_value:
+            value = self.calculate_value_with_cumulative_fees(value)
+        if self.liquidity_index is not None:
+            return self.transact_with_retries(source_client, target_client, value)
+
+        path: ArrayPath = self.find_path(source_client, target_client)
+        return self.verify_and_transfer(path, value)
+
+    def transact_with_retries(self, source_client: int, target_client: int, value: float) -> bool:
+        """
+        Try a random path as transact does, and if it fails, retry up to MAX_PAYMENT_ATTEMPTS - 1 times with paths drawn
+        by find_retry_path. Only a transaction which fails all of its attempts is counted in fail_histogram, at the
+        failed hop of the last path it tried, and the failures of the first paths and the retries are counted in
+        path_counters.
+        :param source_client:
+        :param target_client:
+        :param value:
+        :return: Whether one of the attempts succeeded.
+        """
+        if value < 0:
+            raise ValueError("Tried to send negative value: ", value)
+
+        hop_values, hop_fees = self.calculate_hop_schedule(value)
+        path: Optional[ArrayPath] = self.find_path(source_client, target_client)
+        failed_hop: Optional[int] = None
+        for attempt in range(self.configuration.max_payment_attempts):
+            if attempt > 0:
+                self.path_counters[RETRIES] += 1
+                path = self.find_retry_path(source_client, target_client, hop_values)
+                if path is None:
+                    continue
+            path_failed_hop: Optional[int] = self.get_failed_hop(path, hop_values)
+            if path_failed_hop is None:
+                self.transfer_along_path(path, hop_values, hop_fees)
+                return True
+            if attempt == 0:
+                self.path_counters[FIRST_ATTEMPT_FAILURES] += 1
+            failed_hop = path_failed_hop
+        self.fail_histogram[failed_hop] += 1
+        return False
+
+    def find_retry_path(self, source_client: int, target_client: int, hop_values: List[float]) -> Optional[ArrayPath]:
+        """
+        Draw a path hop by hop through channels which can carry the values of the hops: the client channels among the
+        channels of the clients, and every middle relay from the liquidity index of the relay before it. The draw may
+        reach a relay with no such channel, as a sender which doesn't know the whole network would.
+        :param source_client:
+        :param target_client:
+        :param hop_values: See calculate_hop_schedule.
+        :return: The path, or None if the draw got stuck.
+        """
+        relays_per_client: int = self.configuration.number_of_relays_per_client
+        hops_number: int = self.configuration.hops_number
+        source_channels = [channel for channel in range(source_client * relays_per_client,
+                                                        (source_client + 1) * relays_per_client)
+                           if self.client_channel_balances[channel] >= hop_values[0]]
+        target_channels = [channel for channel in range(target_client * relays_per_client,
+                                                        (target_client + 1) * relays_per_client)
+                           if self.relay_client_channel_balances[channel] >= hop_values[hops_number + 2]]
+        if not source_channels or not target_channels:
+            return None
+        source_channel: int = self.random_stream.choice(source_channels)
+        target_channel: int = self.random_stream.choice(target_channels)
+        first_relay = int(self.client_channel_relays[source_channel])
+        target_relay = int(self.client_channel_relays[target_channel])
+
+        relay_channel_balances = self.relay_channel_balances
+        relays: List[int] = [first_relay]
+        excluded_relays = {first_relay, target_relay}
+        for hop in range(hops_number):
+            if hop < hops_number - 1:
+                def is_allowed(relay: int) -> bool:
+                    return relay not in excluded_relays
+            else:
+                # The last middle relay must also be able to carry the hop to the target relay.
+                def is_allowed(relay: int) -> bool:
+                    return relay not in excluded_relays and \
+                        relay_channel_balances[relay, target_relay] >= hop_values[hops_number + 1]
+            relay = self.liquidity_index.sample(relays[-1], hop_values[hop + 1], is_allowed, self.random_stream)
+            if relay is None:
+                return None
+            relays.append(relay)
+            excluded_relays.add(relay)
+        # Without middle relays, the first relay sends the hop to the target relay itself.
+        if hops_number == 0 and relay_channel_balances[first_relay, target_relay] < hop_values[1]:
+            return None
+        relays.append(target_relay)
+        return source_channel, relays, target_channel
+
+    def transact_batch(self, transaction_values: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Perform a transaction between a random pair of clients for each value, with the same results as performing them
+        one after the other. The paths and the per-hop values of all the transactions are computed at once, and the
+        transactions are applied in rounds: a transaction is in the round after the latest round of the earlier
+        transactions it shares a channel with. The transactions of a round don't share channels, and see every earlier
+        transaction on their channels and no later one, so each round is checked and applied with vectorized
+        operations.
+        :param transaction_values:
+        :return: Whether each transaction succeeded, and the relays mean balance after each transaction.
+        """
+        if self.liquidity_index is not None:
+            # A retry depends on the balances left by all the transactions before it.
+            return LightningNetwork.transact_batch(self, transaction_values)
+
+        values = np.asarray(transaction_values, dtype=np.float64)
+        if self.configuration.add_fees_to_value:
+            values = self.calculate_value_with_cumulative_fees(values)
+        if np.any(values < 0):
+            raise ValueError("Tried to send negative value: ", values[values < 0][0])
+
+        paths: ArrayPaths = self.sample_paths(len(values))
+        hop_values, hop_fees = self.calculate_hop_values(values)
+        successes = np.ones(len(values), dtype=bool)
+
+        if self.configuration.is_liquidity_assumed:
+            self.apply_paths(paths, hop_values, np.arange(len(values)))
+        else:
+            rounds = self.calculate_transaction_rounds(self.get_channel_keys(paths))
+            rounds_transactions = np.split(np.argsort(rounds, kind='stable'), np.cumsum(np.bincount(rounds))[:-1])
+            for transactions in rounds_transactions:
+                successes[transactions] = self.verify_paths(paths, hop_values, transactions)
+                self.apply_paths(paths, hop_values, transactions[successes[transactions]])
+
+        self.update_ledger(paths, hop_values, np.flatnonzero(successes))
+
+        # The fees of each transaction are accumulated hop by hop, as in transact, and the fees added in the last hop
+        # shouldn't be collected.
+        fees_increments = np.zeros((len(values), hop_fees.shape[1] + 1), dtype=np.float64)
+        fees_increments[successes, :-1] = hop_fees[successes]
+        fees_increments[successes, -1] = -hop_fees[successes, -1]
+        sums_relays_balances = np.cumsum(np.concatenate(([self.sum_relays_balances], fees_increments.ravel())))
+        sums_relays_balances = sums_relays_balances[fees_increments.shape[1]::fees_increments.shape[1]]
+        if len(values) > 0:
+            self.sum_relays_balances = float(sums_relays_balances[-1])
+
+        return successes, sums_relays_balances / len(self.relays)
+
+    def sample_paths(self, count: int) -> ArrayPaths:
+        """
+        Draw the client pairs, bootstrap relays and middle relays of count transactions at once. The middle relays are
+        drawn by index arithmetic: the k-th middle relay is a uniform rank among the relays which are not already in the
+        path, shifted past the sorted relays which are.
+        :param count:
+        :return:
+        """
+        number_of_clients: int = len(self.clients)
+        number_of_relays: int = len(self.relays)
+        relays_per_client: int = self.configuration.number_of_relays_per_client
+
+        random_generator: np.random.Generator = self.random_generator
+        source_clients = random_generator.integers(0, number_of_clients, size=count)
+        target_clients = random_generator.integers(0, number_of_clients - 1, size=count)
+        target_clients += target_clients >= source_clients
+
+        source_channels = source_clients * relays_per_client + \
+            random_generator.integers(0, relays_per_client, size=count)
+        target_channels = target_clients * relays_per_client + \
+            random_generator.integers(0, relays_per_client, size=count)
+        first_relays = self.client_channel_relays[source_channels]
+        target_relays = self.client_channel_relays[target_channels]
+
+        # The first relay and the target relay may be the same relay.
+        excluded_relays = np.stack((first_relays, target_relays), axis=1)
+        excluded_relays[first_relays == target_relays, 1] = number_of_relays
+        middle_relays = self.sample_distinct_relays(excluded_relays, self.configuration.hops_number)
+
+        path_relays = np.column_stack((first_relays, middle_relays, target_relays))
+        return source_channels, path_relays, target_channels
+
+    def sample_distinct_relays(self, excluded_relays: np.ndarray, count: int) -> np.ndarray:
+        """
+        Draw count distinct relays for each row of excluded_relays, which aren't in the row. The k-th relay of a row is a
+        uniform rank among the relays which weren't excluded or drawn yet, shifted past the sorted relays which were.
+        :param excluded_relays: Relays to exclude in each row, where number_of_relays stands for no relay.
+        :param count:
+        :return:
+        """
+        number_of_relays: int = len(self.relays)
+        rows: int = len(excluded_relays)
+        excluded_relays = np.sort(excluded_relays, axis=1)
+        excluded_count = np.sum(excluded_relays < number_of_relays, axis=1)
+
+        sampled_relays = np.empty((rows, count), dtype=np.int64)
+        for k in range(count):
+            available_count = number_of_relays - excluded_count - k
+            if np.any(available_count <= 0):
+                raise ValueError("Sample larger than population or is negative")
+            relays = (self.random_generator.random(rows) * available_count).astype(np.int64)
+            for column in range(excluded_relays.shape[1]):
+                relays += relays >= excluded_relays[:, column]
+            sampled_relays[:, k] = relays
+            excluded_relays = np.sort(np.column_stack((excluded_relays, relays)), axis=1)
+        return sampled_relays
+
+    def calculate_hop_values(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+
+        :param values:
+        :return: The value sent in each hop of the paths of values, followed by the value left after the last hop, and
+         the fees deducted in each hop.
+        """
+        hops_in_path: int = self.configuration.hops_number + 3
+        hop_values = np.empty((len(values), hops_in_path + 1), dtype=np.float64)
+        hop_fees = np.empty((len(values), hops_in_path), dtype=np.float64)
+        hop_values[:, 0] = values
+        for hop in range(hops_in_path):
+            hop_values[:, hop + 1], hop_fees[:, hop] = self.deduct_fees_from_value(hop_values[:, hop])
+        return hop_values, hop_fees
+
+    def get_channel_keys(self, paths: ArrayPaths) -> np.ndarray:
+        """
+
+        :param paths:
+        :return: A key for the (undirected) channel of each hop in the paths.
+        """
+        source_channels, path_relays, target_channels = paths
+        number_of_relays: int = len(self.relays)
+        relay_channel_keys = np.minimum(path_relays[:, :-1], path_relays[:, 1:]) * number_of_relays \
+            + np.maximum(path_relays[:, :-1], path_relays[:, 1:])
+        client_channel_offset: int = number_of_relays * number_of_relays
+        return np.column_stack((source_channels + client_channel_offset,
+                                relay_channel_keys,
+                                target_channels + client_channel_offset))
+
+    @staticmethod
+    def calculate_transaction_rounds(channel_keys: np.ndarray) -> np.ndarray:
+        """
+
+        :param channel_keys:
+        :return: The round of each transaction: 0 if no earlier transaction shares a channel with it, otherwise one
+         more than the latest round of those transactions.
+        """
+        transactions_count, hops_in_path = channel_keys.shape
+        # Dense indices of the channels, so the last round of every channel is kept in a list.
+        unique_keys, channels = np.unique(channel_keys.ravel(), return_inverse=True)
+        transactions_channels: List[List[int]] = channels.reshape(transactions_count, hops_in_path).tolist()
+
+        # A single pass in transaction order, where the last round of a channel is the latest round of the earlier
+        # transactions which use it.
+        last_rounds: List[int] = [-1] * len(unique_keys)
+        rounds: List[int] = [0] * transactions_count
+        for transaction, transaction_channels in enumerate(transactions_channels):
+            transaction_round = 1 + max([last_rounds[channel] for channel in transaction_channels], default=-1)
+            rounds[transaction] = transaction_round
+            for channel in transaction_channels:
+                last_rounds[channel] = transaction_round
+        return np.asarray(rounds, dtype=np.int64)
+
+    def verify_paths(self, paths: ArrayPaths, hop_values: np.ndarray, transactions: np.ndarray) -> np.ndarray:
+        """
+        Verify the paths of transactions which don't share a channel, and count the failures in fail_histogram.
+        :param paths:
+        :param hop_values:
+        :param transactions:
+        :return: Whether each of the transactions can be performed.
+        """
+        source_channels, path_relays, target_channels = paths
+        relays = path_relays[transactions]
+        balances = np.column_stack((self.client_channel_balances[source_channels[transactions]],
+                                    self.relay_channel_balances[relays[:, :-1], relays[:, 1:]],
+                                    self.relay_client_channel_balances[target_channels[transactions]]))
+        insufficient = hop_values[transactions, :-1] > balances
+        failed = np.any(insufficient, axis=1)
+
+        failed_hops = np.bincount(np.argmax(insufficient[failed], axis=1), minlength=len(self.fail_histogram))
+        for hop, fails in enumerate(failed_hops.tolist()):
+            self.fail_histogram[hop] += fails
+        return np.logical_not(failed)
+
+    def apply_paths(self, paths: ArrayPaths, hop_values: np.ndarray, transactions: np.ndarray):
+        """
+        Move the value of each hop of the transactions' paths, in order of the transactions.
+        :param paths:
+        :param hop_values:
+        :param transactions:
+        :return:
+        """
+        source_channels, path_relays, target_channels = paths
+        relays = path_relays[transactions]
+        values = hop_values[transactions]
+
+        # Updates of the same balance are applied in the order of the transactions, and in the order of the hops within
+        # a transaction, so the results are identical to transacting one transaction after the other.
+        client_channels = np.column_stack((source_channels[transactions], target_channels[transactions]))
+        np.add.at(self.client_channel_balances, client_channels, np.column_stack((-values[:, 0], values[:, -2])))
+        np.add.at(self.relay_client_channel_balances, client_channels, np.column_stack((values[:, 0], -values[:, -2])))
+
+        senders, receivers = relays[:, :-1], relays[:, 1:]
+        relay_values = values[:, 1:-2]
+        np.add.at(self.relay_channel_balances,
+                  (np.stack((senders, receivers), axis=2), np.stack((receivers, senders), axis=2)),
+                  np.stack((-relay_values, relay_values), axis=2))
+
+    def update_ledger(self, paths: ArrayPaths, hop_values: np.ndarray, transactions: np.ndarray):
+        """
+        Record the value each relay in the transactions' paths received and sent in the relays balance ledger, in the
+        order of the transactions and of the hops, as transact does.
+        :param paths:
+        :param hop_values:
+        :param transactions:
+        :return:
+        """
+        source_channels, path_relays, target_channels = paths
+        relays = path_relays[transactions]
+        values = hop_values[transactions]
+        senders, receivers = relays[:, :-1], relays[:, 1:]
+        relay_values = values[:, 1:-2]
+
+        ledger_relays = np.column_stack((relays[:, 0],
+                                         np.stack((senders, receivers), axis=2).reshape(len(relays), -1),
+                                         relays[:, -1]))
+        ledger_values = np.column_stack((values[:, 0],
+                                         np.stack((-relay_values, relay_values), axis=2).reshape(len(relays), -1),
+                                         -values[:, -2]))
+        self.relays_balance_ledger.add_at(ledger_relays, ledger_values)
+
+    def find_path(self, source_client: int, target_client: int) -> ArrayPath:
+        """
+
+        :param source_client:
+        :param target_client:
+        :return:
+        """
+        relays_per_client: int = self.configuration.number_of_relays_per_client
+        source_channel: int = source_client * relays_per_client + self.random_stream.randrange(relays_per_client)
+        target_channel: int = target_client * relays_per_client + self.random_stream.randrange(relays_per_client)
+        first_relay = int(self.client_channel_relays[source_channel])
+        target_relay = int(self.client_channel_relays[target_channel])
+
+        middle_relays = self.sample_relays(self.configuration.hops_number, {first_relay, target_relay})
+        return source_channel, [first_relay] + middle_relays + [target_relay], target_channel
+
+    def verify_path(self, path: ArrayPath, value: float) -> bool:
+        """
+
+        :param path:
+        :param value:
+        :return:
+        """
+        if value < 0:
+            raise ValueError("Tried to send negative value: ", value)
+
+        if self.configuration.is_liquidity_assumed:
+            return True
+
+        return self.verify_path_hops(path, self.calculate_hop_schedule(value)[0]) is not None
+
+    def verify_path_hops(self, path: ArrayPath, hop_values: List[float]) -> Optional[ArrayPath]:
+        """
+        Check that the sender of every hop has the value of the hop in its channel, and count a failure in
+        fail_histogram at the first hop which doesn't.
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :return: The path, or None if a hop failed.
+        """
+        failed_hop: Optional[int] = self.get_failed_hop(path, hop_values)
+        if failed_hop is not None:
+            self.fail_histogram[failed_hop] += 1
+            return None
+        return path
+
+    def get_failed_hop(self, path: ArrayPath, hop_values: List[float]) -> Optional[int]:
+        """
+
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :return: The first hop whose sender doesn't have the value of the hop in its channel, or None if there is none.
+        """
+        if self.configuration.is_liquidity_assumed:
+            return None
+
+        source_channel, relays, target_channel = path
+        if hop_values[0] > self.client_channel_balances[source_channel]:
+            return 0
+
+        relay_channel_balances = self.relay_channel_balances
+        for i in range(len(relays) - 1):
+            if hop_values[i + 1] > relay_channel_balances[relays[i], relays[i + 1]]:
+                return i + 1
+
+        if hop_values[len(relays)] > self.relay_client_channel_balances[target_channel]:
+            return len(relays)
+
+        return None
+
+    def transfer_along_path(self, path: ArrayPath, hop_values: List[float], hop_fees: List[float]):
+        """
+        Transfer the value of every hop in its channel, from its sender to its receiver, and collect the fees.
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :param hop_fees: See calculate_hop_schedule.
+        :return:
+        """
+        source_channel, relays, target_channel = path
+        relay_channel_balances = self.relay_channel_balances
+        ledger = self.relays_balance_ledger
+        sum_relays_balances: float = self.sum_relays_balances
+
+        value = hop_values[0]
+        self.client_channel_balances[source_channel] -= value
+        self.relay_client_channel_balances[source_channel] += value
+        ledger.add(relays[0], value)
+        sum_relays_balances += hop_fees[0]
+
+        for i in range(len(relays) - 1):
+            current_relay, next_relay, value = relays[i], relays[i + 1], hop_values[i + 1]
+            relay_channel_balances[current_relay, next_relay] -= value
+            relay_channel_balances[next_relay, current_relay] += value
+            ledger.add(current_relay, -value)
+            ledger.add(next_relay, value)
+            sum_relays_balances += hop_fees[i + 1]
+        if self.liquidity_index is not None:
+            for i in range(len(relays) - 1):
+                self.liquidity_index.update(relays[i], relays[i + 1])
+                self.liquidity_index.update(relays[i + 1], relays[i])
+
+        value = hop_values[len(relays)]
+        self.relay_client_channel_balances[target_channel] -= value
+        self.client_channel_balances[target_channel] += value
+        ledger.add(relays[-1], -value)
+        sum_relays_balances += hop_fees[len(relays)]
+
+        # The fees of the last hop shouldn't be collected.
+        self.sum_relays_balances = sum_relays_balances - hop_fees[len(relays)]
+
+    def get_memory_report(self) -> Dict[str, float]:
+        """
+        :return: The memory footprint of the network: the number of nodes and channels, the average bytes per node and
+         per channel, and the total bytes of the network.
+        """
+        number_of_relays: int = len(self.relays)
+        nodes_bytes: int = self.relays_balance.nbytes + self.clients_balance.nbytes + \
+            self.relays_balance_ledger.get_balances().nbytes
+        channels_bytes: int = self.relay_channel_balances.nbytes + self.client_channel_relays.nbytes + \
+            self.client_channel_balances.nbytes + self.relay_client_channel_balances.nbytes
+        return self.create_memory_report(number_of_relays + len(self.clients), nodes_bytes,
+                                         number_of_relays * (number_of_relays - 1) // 2 + len(self.client_channel_relays),
+                                         channels_bytes, sys.getsizeof(self.fail_histogram))
+
+    def restore(self, snapshot, random_generator: np.random.Generator = None):
+        """
+        See LightningNetwork.restore, which also resets the liquidity index.
+        :param snapshot:
+        :param random_generator:
+        :return:
+        """
+        super().restore(snapshot, random_generator)
+        if self.liquidity_index is not None:
+            self.liquidity_index.rebuild()
+
+    def get_channel_balances(self) -> np.ndarray:
+        """
+        :return: The balances of all the channels, which the balance arrays are views of.
+        """
+        return self.channel_balances
+
+    def set_channel_balances(self, channel_balances: np.ndarray):
+        """
+
+        :param channel_balances: See get_channel_balances.
+        :return:
+        """
+        np.copyto(self.channel_balances, channel_balances)
+
+    def create_relays_balance_ledger(self) -> RelaysBalanceLedger:
+        """
+        :return: Ledger of the relays balances, which transact updates on every transfer in the relays channels.
+        """
+        return RelaysBalanceLedger(self.calculate_relays_balances())
+
+    def calculate_relays_balances(self) -> List[float]:
+        """
+
+        :return:
+        """
+        relays_balances = self.relays_balance + self.relay_channel_balances.sum(axis=1) + np.bincount(
+            self.client_channel_relays, weights=self.relay_client_channel_balances, minlength=len(self.relays))
+        return relays_balances.tolist()
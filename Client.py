@@ -4,28 +4,30 @@ from typing import List
 
 
 class Client(Node):
-    def __init__(self, bootstrap_relays: List[Relay], network_configuration):
+    __slots__ = ('relays',)
+
+    def __init__(self, node_id: int, bootstrap_relays: List[Relay], network_configuration):
         """
 
+        :param node_id:
         :param bootstrap_relays:
         :param network_configuration:
         """
-        super().__init__(network_configuration)
-        self.network_configuration = network_configuration
+        super().__init__(node_id)
         self.relays: List[Relay] = bootstrap_relays
         for relay in bootstrap_relays:
-            self.create_channel_with_relay(relay)
+            self.create_channel_with_relay(relay, network_configuration)
 
-    def create_channel_with_relay(self, relay: Relay):
+    def create_channel_with_relay(self, relay: Relay, network_configuration):
         """
 
         :param relay:
+        :param network_configuration:
         :return:
         """
         self.create_channel(
-            owner_balance=self.network_configuration.default_balance_client_relay_channel_client,
+            owner_balance=network_configuration.default_balance_client_relay_channel_client,
             other_owner=relay,
-            other_owner_balance=self.network_configuration.default_balance_client_relay_channel_relay
+            other_owner_balance=network_configuration.default_balance_client_relay_channel_relay,
+            channel_cost=network_configuration.channel_cost
         )
-
-
@@ -5,11 +5,41 @@ HOPS_NUMBER: int = 3
 NUMBER_OF_RELAYS: int = 50
 NUMBER_OF_CLIENTS: int = 5000
 NUMBER_OF_RELAYS_PER_CLIENT: int = 1
+ENGINE: str = 'object'
+LAZY_CONSTRUCTION: bool = False
+TOPOLOGY: str = 'full'
+RELAY_DEGREE: int = 8
+TOPOLOGY_PATH: str = None
+CAPACITY_AWARE_PATHS: bool = False
+MAX_PAYMENT_ATTEMPTS: int = 1
+ARRIVAL_PROCESS: str = 'poisson'
+ARRIVAL_RATE: float = 1.
+MEAN_HOLD_TIME: float = 0.
 R2R_CHANNEL_BALANCES: List[float] = [10 ** 6, 5 * (10 ** 6), 10 ** 7, 10 ** 8]
 R2C_CHANNEL_BALANCES: List[float] = [10 ** 6, 5 * (10 ** 6), 10 ** 7, 10 ** 8]
 TRANSACTION_PROPORTIONAL_FEES: List[float] = [0.005, 0.01, 0.02, 0.03, 0.04, 0.05]
 
 TRANSACTION_NUM: int = 10 ** 4
+TRANSACTION_BATCH_SIZE: int = 0
+RECORDING_POLICY: str = 'every'
+RECORDING_RESOLUTION: int = 1
 AVG_ACROSS_COUNT: int = 5
+ADAPTIVE_REPETITIONS: bool = False
+MAX_REPETITIONS_COUNT: int = 20
+MEAN_BALANCE_STANDARD_ERROR_TARGET: float = 10 ** 4
+FAIL_RATE_STANDARD_ERROR_TARGET: float = 0.005
+TRANSACTION_SAMPLES_SEED: int = 0
+SIMULATION_SEED: int = 0
+RESULTS_CACHE_DIRECTORY: str = 'results/cache'
+REUSE_NETWORKS: bool = False
+
+COLLECT_SIMULATION_STATS: bool = False
+PROFILE_DIRECTORY: str = None
 
 CPU_NUM_RATIO: float = 0.75
+EXECUTION_MODE: str = 'pool'
+WORK_QUEUE_DIRECTORY: str = 'results/queue'
+QUEUE_LOCAL_WORKERS_NUM: int = None
+QUEUE_CLAIM_LEASE_SECONDS: float = 60.
+RENDERING_PROCESSES_NUM: int = 1
+PLOT_FORMATS: List[str] = ['png', 'tex']
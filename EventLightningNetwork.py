@@ -0,0 +1,183 @@
+from typing import List, Tuple, Sequence, Dict
+from LightningNetwork import LightningNetwork, LightningNetworkConfiguration, POISSON_ARRIVALS
+from ArrayLightningNetwork import ArrayLightningNetwork, ArrayPath
+import heapq
+import math
+import numpy as np
+
+# The metrics of get_event_metrics, in their order.
+EVENT_METRICS: Tuple[str, ...] = ('time', 'throughput', 'concurrent_locks', 'mean_concurrent_locks',
+                                  'max_concurrent_locks', 'locked_value')
+
+
+class EventLightningNetwork(ArrayLightningNetwork):
+    """
+    Lightning Network where transactions take time, as a discrete-event simulation on top of ArrayLightningNetwork.
+
+    Every call to transact is the arrival of a transaction, ARRIVAL_RATE transactions per unit of time on average. A
+    transaction whose path has the values of its hops locks them, out of the balances of their senders, for a hold time
+    drawn with a mean of MEAN_HOLD_TIME, and settles when it ends, which transfers them to the receivers and collects
+    the fees. While the values are locked no other transaction can use them, so a transaction fails at the first hop
+    whose sender doesn't have the value of the hop apart from its locked values. The settlements are events in a heap
+    ordered by their times, which are resolved in order before every arrival.
+    """
+    def __init__(self, configuration: LightningNetworkConfiguration, random_generator: np.random.Generator = None):
+        """
+
+        :param configuration: Must not assume liquidity.
+        :param random_generator:
+        """
+        if configuration.is_liquidity_assumed:
+            raise ValueError("The event engine only simulates networks where liquidity is not assumed")
+        super().__init__(configuration, random_generator)
+        self.reset_events()
+
+    def reset_events(self):
+        """
+        Reset the clock, and drop the transactions in flight without settling them.
+        :return:
+        """
+        self.clock: float = 0.
+        # (settlement time, transaction id) of every transaction in flight.
+        self.event_queue: List[Tuple[float, int]] = list()
+        # The path, hop values and hop fees of every transaction in flight, by its id.
+        self.in_flight: Dict[int, Tuple[ArrayPath, List[float], List[float]]] = dict()
+        self.next_transaction_id: int = 0
+        self.settled_count: int = 0
+        self.locked_value: float = 0.
+        # The largest number of transactions in flight at once.
+        self.max_concurrent_locks: int = 0
+        # The integral of the number of transactions in flight over time.
+        self.concurrent_locks_integral: float = 0.
+
+    def restore(self, snapshot, random_generator: np.random.Generator = None):
+        """
+        See LightningNetwork.restore, which also resets the clock and drops the transactions in flight.
+        :param snapshot:
+        :param random_generator:
+        :return:
+        """
+        super().restore(snapshot, random_generator)
+        self.reset_events()
+
+    def transact(self, source_client: int, target_client: int, value: float) -> bool:
+        """
+        The arrival of a transaction, after the settlements which precede it.
+        :param source_client:
+        :param target_client:
+        :param value:
+        :return: Whether the transaction locked its values, after which it always settles.
+        """
+        self.advance_clock(self.clock + self.draw_interarrival_time())
+        if self.configuration.add_fees_to_value:
+            value = self.calculate_value_with_cumulative_fees(value)
+        if value < 0:
+            raise ValueError("Tried to send negative value: ", value)
+
+        hop_values, hop_fees = self.calculate_hop_schedule(value)
+        path: ArrayPath = self.verify_path_hops(self.find_path(source_client, target_client), hop_values)
+        if path is None:
+            return False
+
+        hold_time: float = self.draw_hold_time()
+        if hold_time == 0:
+            self.transfer_along_path(path, hop_values, hop_fees)
+            self.settled_count += 1
+            return True
+
+        self.lock_path(path, hop_values, -1.)
+        transaction_id: int = self.next_transaction_id
+        self.next_transaction_id += 1
+        self.in_flight[transaction_id] = (path, hop_values, hop_fees)
+        heapq.heappush(self.event_queue, (self.clock + hold_time, transaction_id))
+        self.max_concurrent_locks = max(self.max_concurrent_locks, len(self.in_flight))
+        return True
+
+    def transact_batch(self, transaction_values: Sequence[float]) -> Tuple[Sequence[bool], Sequence[float]]:
+        """
+        Every transaction depends on the ones still in flight when it arrives, so the transactions are performed one
+        after the other.
+        :param transaction_values:
+        :return: See LightningNetwork.transact_batch.
+        """
+        return LightningNetwork.transact_batch(self, transaction_values)
+
+    def draw_interarrival_time(self) -> float:
+        """
+        :return: The time between the arrival of the previous transaction and the next one.
+        """
+        mean_interarrival_time: float = 1. / self.configuration.arrival_rate
+        if self.configuration.arrival_process == POISSON_ARRIVALS:
+            return -math.log(1. - self.random_stream.random()) * mean_interarrival_time
+        return mean_interarrival_time
+
+    def draw_hold_time(self) -> float:
+        """
+        :return: The time a transaction locks its values for.
+        """
+        if self.configuration.mean_hold_time == 0:
+            return 0.
+        return -math.log(1. - self.random_stream.random()) * self.configuration.mean_hold_time
+
+    def advance_clock(self, time: float):
+        """
+        Settle the transactions in flight whose hold times end until time, in the order of their settlement times, and
+        move the clock to time.
+        :param time:
+        :return:
+        """
+        event_queue = self.event_queue
+        while event_queue and event_queue[0][0] <= time:
+            settlement_time, transaction_id = heapq.heappop(event_queue)
+            self.concurrent_locks_integral += len(self.in_flight) * (settlement_time - self.clock)
+            self.clock = settlement_time
+            self.settle(transaction_id)
+        self.concurrent_locks_integral += len(self.in_flight) * (time - self.clock)
+        self.clock = time
+
+    def settle(self, transaction_id: int):
+        """
+        Release the locked values of a transaction in flight and transfer them along its path.
+        :param transaction_id:
+        :return:
+        """
+        path, hop_values, hop_fees = self.in_flight.pop(transaction_id)
+        self.lock_path(path, hop_values, 1.)
+        self.transfer_along_path(path, hop_values, hop_fees)
+        self.settled_count += 1
+
+    def lock_path(self, path: ArrayPath, hop_values: List[float], sign: float):
+        """
+        Move the value of every hop out of the balance of its sender, or back into it.
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :param sign: -1 to lock the values, 1 to release them.
+        :return:
+        """
+        source_channel, relays, target_channel = path
+        relay_channel_balances = self.relay_channel_balances
+        self.client_channel_balances[source_channel] += sign * hop_values[0]
+        for i in range(len(relays) - 1):
+            relay_channel_balances[relays[i], relays[i + 1]] += sign * hop_values[i + 1]
+        self.relay_client_channel_balances[target_channel] += sign * hop_values[len(relays)]
+        self.locked_value -= sign * float(sum(hop_values[:len(relays) + 1]))
+
+    def get_event_metrics(self) -> List[float]:
+        """
+        :return: The metrics of EVENT_METRICS: the clock, the number of settled transactions per unit of time, the
+         number of transactions in flight, its mean over time and its maximum so far, and the sum of the values they
+         lock.
+        """
+        if self.clock == 0:
+            return [0., 0., float(len(self.in_flight)), 0., float(self.max_concurrent_locks), self.locked_value]
+        return [self.clock, self.settled_count / self.clock, float(len(self.in_flight)),
+                self.concurrent_locks_integral / self.clock, float(self.max_concurrent_locks), self.locked_value]
+
+    def get_memory_report(self) -> Dict[str, float]:
+        """
+        :return: See ArrayLightningNetwork.get_memory_report, where the total also counts the transactions in flight.
+        """
+        memory_report: Dict[str, float] = super().get_memory_report()
+        # Every transaction in flight holds its heap entry, and the relays, hop values and hop fees of its path.
+        memory_report['total_bytes'] += len(self.in_flight) * (self.configuration.hops_number + 2) * 3 * 8
+        return memory_report
@@ -1,8 +1,39 @@
-from typing import List, Set, Dict, Tuple
+from typing import List, Set, Dict, Tuple, Sequence, Optional
 from Node import Node
+from Channel import Channel
 from Client import Client
 from Relay import Relay
-import random
+from RelaysBalanceLedger import RelaysBalanceLedger
+from RandomStream import RandomStream
+from SimulationStats import SimulationStats
+from Topology import FULL_TOPOLOGY, TOPOLOGIES
+import numpy as np
+import sys
+
+OBJECT_ENGINE: str = 'object'
+ARRAY_ENGINE: str = 'array'
+# Only for networks where liquidity is assumed.
+ANALYTIC_ENGINE: str = 'analytic'
+# The only engine whose relays aren't necessarily a full mesh.
+SPARSE_ENGINE: str = 'sparse'
+# Transactions take time and lock their values until they settle, see EventLightningNetwork.
+EVENT_ENGINE: str = 'event'
+ENGINES: Tuple[str, ...] = (OBJECT_ENGINE, ARRAY_ENGINE, ANALYTIC_ENGINE, SPARSE_ENGINE, EVENT_ENGINE)
+
+# The processes of the arrival times of the transactions of the event engine.
+POISSON_ARRIVALS: str = 'poisson'
+DETERMINISTIC_ARRIVALS: str = 'deterministic'
+ARRIVAL_PROCESSES: Tuple[str, ...] = (POISSON_ARRIVALS, DETERMINISTIC_ARRIVALS)
+
+# The counters of the path searches of a network, see LightningNetwork.get_path_counters: the transactions for which no
+# path was found, the searches which reached SparseLightningNetwork.PATH_SEARCH_STEPS_LIMIT before they could rule out a
+# path, which are also unroutable, and the transactions whose first path failed and the retry paths they drew, see
+# ArrayLightningNetwork.transact_with_retries.
+UNROUTABLE: str = 'unroutable'
+ABANDONED_SEARCHES: str = 'abandoned_searches'
+FIRST_ATTEMPT_FAILURES: str = 'first_attempt_failures'
+RETRIES: str = 'retries'
+PATH_COUNTERS: Tuple[str, ...] = (UNROUTABLE, ABANDONED_SEARCHES, FIRST_ATTEMPT_FAILURES, RETRIES)
 
 
 class LightningNetworkConfiguration:
@@ -18,7 +49,18 @@ class LightningNetworkConfiguration:
                  add_fees_to_value: bool,
                  number_of_relays: int,
                  number_of_clients: int,
-                 number_of_relays_per_client: int):
+                 number_of_relays_per_client: int,
+                 engine: str = OBJECT_ENGINE,
+                 transaction_batch_size: int = 0,
+                 is_construction_lazy: bool = False,
+                 topology: str = FULL_TOPOLOGY,
+                 relay_degree: int = 8,
+                 topology_path: str = None,
+                 is_path_capacity_aware: bool = False,
+                 max_payment_attempts: int = 1,
+                 arrival_process: str = POISSON_ARRIVALS,
+                 arrival_rate: float = 1.,
+                 mean_hold_time: float = 0.):
         """
 
         :param default_balance_client_relay_channel_client:
@@ -32,7 +74,39 @@ class LightningNetworkConfiguration:
         :param number_of_relays:
         :param number_of_clients:
         :param number_of_relays_per_client:
+        :param engine: The balance engine backing the network, one of ENGINES.
+        :param transaction_batch_size: Number of transactions to simulate together with transact_batch, 0 to simulate
+         one transaction at a time.
+        :param is_construction_lazy: Whether to create relay-relay channels and clients only when a transaction first
+         uses them, instead of when the network is created.
+        :param topology: The channels between the relays, one of Topology.TOPOLOGIES.
+        :param relay_degree: See Topology.create_topology.
+        :param topology_path: See Topology.create_topology.
+        :param is_path_capacity_aware: Whether path selection only takes channels whose sender has the value of the hop.
+        :param max_payment_attempts: The number of paths a transaction tries before it fails. Every retry draws a path
+         through channels which can carry the values of its hops.
+        :param arrival_process: The process of the arrival times of the transactions of the event engine, one of
+         ARRIVAL_PROCESSES.
+        :param arrival_rate: The mean number of transactions which arrive in a unit of time, in the event engine.
+        :param mean_hold_time: The mean of the exponentially distributed time a transaction of the event engine locks
+         its values for before it settles, 0 to settle it as soon as it arrives.
         """
+        if engine not in ENGINES:
+            raise ValueError("Unknown engine: ", engine)
+        if topology not in TOPOLOGIES:
+            raise ValueError("Unknown topology: ", topology)
+        if topology != FULL_TOPOLOGY and engine != SPARSE_ENGINE:
+            raise ValueError("Only the sparse engine supports topologies other than a full mesh: ", topology)
+        if max_payment_attempts > 1 and engine != ARRAY_ENGINE:
+            raise ValueError("Only the array engine supports retrying payments: ", engine)
+        if arrival_process not in ARRIVAL_PROCESSES:
+            raise ValueError("Unknown arrival process: ", arrival_process)
+        if arrival_rate <= 0 or mean_hold_time < 0:
+            raise ValueError("The arrival rate must be positive and the mean hold time non-negative: ",
+                             arrival_rate, mean_hold_time)
+        if engine == EVENT_ENGINE and transaction_batch_size > 0:
+            raise ValueError("The event engine simulates the transactions one at a time: ", transaction_batch_size)
+
         self.default_balance_client_relay_channel_client: float = default_balance_client_relay_channel_client
         self.default_balance_client_relay_channel_relay: float = default_balance_client_relay_channel_relay
         self.default_balance_relay_relay_channel = default_balance_relay_relay_channel
@@ -45,47 +119,258 @@ class LightningNetworkConfiguration:
         self.number_of_relays: int = number_of_relays
         self.number_of_clients: int = number_of_clients
         self.number_of_relays_per_client: int = number_of_relays_per_client
+        self.engine: str = engine
+        self.transaction_batch_size: int = transaction_batch_size
+        self.is_construction_lazy: bool = is_construction_lazy
+        self.topology: str = topology
+        self.relay_degree: int = relay_degree
+        self.topology_path: str = topology_path
+        self.is_path_capacity_aware: bool = is_path_capacity_aware
+        self.max_payment_attempts: int = max_payment_attempts
+        self.arrival_process: str = arrival_process
+        self.arrival_rate: float = arrival_rate
+        self.mean_hold_time: float = mean_hold_time
+
+
+class NetworkSnapshot:
+    def __init__(self, channel_balances: np.ndarray, relays_balances: np.ndarray, sum_relays_balances: float):
+        """
+        The balances of a network, which LightningNetwork.restore resets it to.
+        :param channel_balances: See LightningNetwork.get_channel_balances.
+        :param relays_balances: The balances in the relays balance ledger.
+        :param sum_relays_balances:
+        """
+        self.channel_balances: np.ndarray = channel_balances
+        self.relays_balances: np.ndarray = relays_balances
+        self.sum_relays_balances: float = sum_relays_balances
+
+
+def get_fail_histogram_length(hops_number: int) -> int:
+    """
+
+    :param hops_number:
+    :return: The length of the fail histogram of a network, which counts the failures at every hop of a path, from the
+     channel of the source client to the channel of the target client, and the transactions for which no path was found
+     in its last bucket.
+    """
+    return hops_number + 4
+
+
+def create_lightning_network(configuration: LightningNetworkConfiguration,
+                             random_generator: np.random.Generator = None) -> 'LightningNetwork':
+    """
+    :param configuration:
+    :param random_generator: See LightningNetwork.
+    :return: A network backed by the balance engine selected in the configuration.
+    """
+    if configuration.engine == ARRAY_ENGINE:
+        # Imported here since ArrayLightningNetwork derives from LightningNetwork.
+        from ArrayLightningNetwork import ArrayLightningNetwork
+        return ArrayLightningNetwork(configuration, random_generator)
+    if configuration.engine == ANALYTIC_ENGINE:
+        from AnalyticLightningNetwork import AnalyticLightningNetwork
+        return AnalyticLightningNetwork(configuration, random_generator)
+    if configuration.engine == SPARSE_ENGINE:
+        from SparseLightningNetwork import SparseLightningNetwork
+        return SparseLightningNetwork(configuration, random_generator)
+    if configuration.engine == EVENT_ENGINE:
+        from EventLightningNetwork import EventLightningNetwork
+        return EventLightningNetwork(configuration, random_generator)
+    return LightningNetwork(configuration, random_generator)
 
 
 class LightningNetwork:
-    def __init__(self, configuration: LightningNetworkConfiguration):
+    def __init__(self, configuration: LightningNetworkConfiguration, random_generator: np.random.Generator = None):
         """
 
         :param configuration:
+        :param random_generator: The generator of all the randomness of the network, unseeded if None.
         """
         self.configuration: LightningNetworkConfiguration = configuration
-        self.relays: Set[Relay] = self.create_relays()
-        self.clients: Set[Client] = self.create_clients()
+        self.random_generator: np.random.Generator = \
+            random_generator if random_generator is not None else np.random.default_rng()
+        self.random_stream: RandomStream = RandomStream(self.random_generator)
+        self.relays: List[Relay] = self.create_relays()
+        self.clients: List[Client] = self.create_clients()
+        self.relays_balance_ledger: RelaysBalanceLedger = self.create_relays_balance_ledger()
         self.sum_relays_balances: float = -self.calc_construction_price()
-        self.fail_histogram: List[int] = [0] * (self.configuration.hops_number + 3)
-
-    def create_relays(self) -> Set[Relay]:
-        """
-        :return: Full-graph of Relays.
-        """
-        relays: Set[Relay] = set()
-        for _ in range(self.configuration.number_of_relays):
-            new_relay = Relay(self.configuration)
-            for other_relay in relays:
-                new_relay.create_channel(
-                    self.configuration.default_balance_relay_relay_channel,
-                    other_relay,
-                    self.configuration.default_balance_relay_relay_channel
-                )
-            relays.add(new_relay)
+        self.fail_histogram: List[int] = [0] * get_fail_histogram_length(self.configuration.hops_number)
+        # The PATH_COUNTERS of the transactions since the network was constructed or restored.
+        self.path_counters: Dict[str, int] = dict.fromkeys(PATH_COUNTERS, 0)
+        # Set by SimulationStats.instrument, if the network is instrumented.
+        self.simulation_stats: Optional[SimulationStats] = None
+        # All the channels, listed on the first call to get_channels.
+        self.channels: List[Channel] = None
+
+    def create_relays(self) -> List[Relay]:
+        """
+        :return: Full-graph of Relays. When the construction is lazy, the channels between the relays are created on
+         their first use, in get_channel.
+        """
+        relays: List[Relay] = list()
+        for i in range(self.configuration.number_of_relays):
+            new_relay = Relay(i)
+            if not self.configuration.is_construction_lazy:
+                for other_relay in relays:
+                    new_relay.create_channel(
+                        self.configuration.default_balance_relay_relay_channel,
+                        other_relay,
+                        self.configuration.default_balance_relay_relay_channel,
+                        self.configuration.channel_cost
+                    )
+            relays.append(new_relay)
         return relays
 
-    def create_clients(self) -> Set[Client]:
+    def create_clients(self) -> List[Client]:
+        """
+        :return: List of network clients, based on the network configuration, connected to bootstrap relays with
+         channels. When the construction is lazy, the clients are None until their first use, in get_client.
+        """
+        if self.configuration.is_construction_lazy:
+            return [None] * self.configuration.number_of_clients
+        return [self.create_client(i) for i in range(self.configuration.number_of_clients)]
+
+    def create_client(self, index: int) -> Client:
+        """
+
+        :param index:
+        :return: A new client, connected with channels to random bootstrap relays.
+        """
+        bootstrap_relays = self.random_stream.sample(self.relays, self.configuration.number_of_relays_per_client)
+        return Client(index, bootstrap_relays, self.configuration)
+
+    def get_client(self, index: int) -> Client:
         """
-        :return: Set of network clients, based on the network configuration, connected to bootstrap relays with
-         channels.
+
+        :param index:
+        :return: The client in the index, created if it wasn't used before.
+        """
+        client = self.clients[index]
+        if client is None:
+            client = self.create_client(index)
+            self.clients[index] = client
+        return client
+
+    def get_channel(self, node: Node, other_node: Node) -> Channel:
+        """
+
+        :param node:
+        :param other_node:
+        :return: The channel between the nodes. When the construction is lazy, a channel between relays is created on
+         its first use, by the relay created later, as create_relays would have.
+        """
+        channel = node.channels.get(other_node)
+        if channel is None and self.configuration.is_construction_lazy:
+            creator, other_relay = (node, other_node) if node.node_id > other_node.node_id else (other_node, node)
+            creator.create_channel(
+                self.configuration.default_balance_relay_relay_channel,
+                other_relay,
+                self.configuration.default_balance_relay_relay_channel,
+                self.configuration.channel_cost
+            )
+            channel = node.channels[other_node]
+        elif channel is None:
+            raise Exception("You cannot transact to this target without a channel!")
+        return channel
+
+    def snapshot(self) -> NetworkSnapshot:
         """
-        clients: Set[Client] = set()
-        for _ in range(self.configuration.number_of_clients):
-            bootstrap_relays = random.sample(self.relays, self.configuration.number_of_relays_per_client)
-            new_client = Client(bootstrap_relays, self.configuration)
-            clients.add(new_client)
-        return clients
+        Capture the balances of the network, so restore can reset it to them instead of constructing it again.
+        :return:
+        """
+        if self.configuration.is_construction_lazy:
+            raise ValueError("The channels of a lazily constructed network change as it's used, it can't be restored")
+        return NetworkSnapshot(self.get_channel_balances().copy(), self.relays_balance_ledger.get_balances().copy(),
+                               self.sum_relays_balances)
+
+    def restore(self, snapshot: NetworkSnapshot, random_generator: np.random.Generator = None):
+        """
+        Reset the balances, the fail histogram and the path counters of the network in place. The relays, the channels
+        and the bootstrap relays of every client are kept.
+        :param snapshot: A snapshot of this network.
+        :param random_generator: The generator of all the randomness of the network from now on, or None to keep the
+         current one.
+        :return:
+        """
+        self.set_channel_balances(snapshot.channel_balances)
+        self.relays_balance_ledger.reset(snapshot.relays_balances)
+        self.sum_relays_balances = snapshot.sum_relays_balances
+        # In place, since SimulationStats counts the failures in this list.
+        self.fail_histogram[:] = [0] * len(self.fail_histogram)
+        self.path_counters.update(dict.fromkeys(PATH_COUNTERS, 0))
+        if random_generator is not None:
+            self.random_generator = random_generator
+            self.random_stream = RandomStream(random_generator)
+
+    def get_channels(self) -> List[Channel]:
+        """
+        :return: All the channels of the network. Every channel has a relay as one of its nodes.
+        """
+        if self.channels is None:
+            channels: Dict[int, Channel] = {id(channel): channel
+                                            for relay in self.relays for channel in relay.channels.values()}
+            self.channels = list(channels.values())
+        return self.channels
+
+    def get_channel_balances(self) -> np.ndarray:
+        """
+        :return: The balances of the first and the second node of every channel, as rows in the order of get_channels.
+        """
+        return np.array([(channel.balance1, channel.balance2) for channel in self.get_channels()],
+                        dtype=np.float64).reshape(-1, 2)
+
+    def set_channel_balances(self, channel_balances: np.ndarray):
+        """
+
+        :param channel_balances: See get_channel_balances.
+        :return:
+        """
+        for channel, (balance1, balance2) in zip(self.get_channels(), channel_balances.tolist()):
+            channel.balance1 = balance1
+            channel.balance2 = balance2
+
+    def create_relays_balance_ledger(self) -> RelaysBalanceLedger:
+        """
+        :return: Ledger of the relays balances, which the relays update on every transfer in their channels.
+        """
+        ledger = RelaysBalanceLedger(self.calculate_relays_balances())
+        for relay in self.relays:
+            relay.ledger = ledger
+        return ledger
+
+    def sample_client_pair(self) -> Tuple[Client, Client]:
+        """
+        Draw two distinct clients by index arithmetic, in O(1) regardless of the number of clients.
+        :return: The source and the target clients of a transaction.
+        """
+        number_of_clients: int = len(self.clients)
+        source_index: int = self.random_stream.randrange(number_of_clients)
+        target_index: int = self.random_stream.randrange(number_of_clients - 1)
+        if target_index >= source_index:
+            target_index += 1
+        return self.get_client(source_index), self.get_client(target_index)
+
+    def sample_relays(self, count: int, excluded_relays: Set[Relay]) -> List[Relay]:
+        """
+        Draw distinct relays which are not in excluded_relays. When the relays to draw and exclude are at most half of
+        the network, draw by rejection in expected O(count), otherwise fall back to sampling from the remaining relays.
+        :param count:
+        :param excluded_relays:
+        :return:
+        """
+        relays = self.relays
+        number_of_relays: int = len(relays)
+        if 2 * (count + len(excluded_relays)) > number_of_relays:
+            return self.random_stream.sample([relay for relay in relays if relay not in excluded_relays], count)
+
+        sampled_relays: List[Relay] = list()
+        rejected_relays: Set[Relay] = set(excluded_relays)
+        while len(sampled_relays) < count:
+            relay = relays[self.random_stream.randrange(number_of_relays)]
+            if relay not in rejected_relays:
+                sampled_relays.append(relay)
+                rejected_relays.add(relay)
+        return sampled_relays
 
     def transact(self, source_client: Client, target_client: Client, value: float) -> bool:
         """
@@ -99,25 +384,54 @@ class LightningNetwork:
             value = self.calculate_value_with_cumulative_fees(value)
 
         path: List[Node] = self.find_path(source_client, target_client)
-        if not self.verify_path(path, value):
-            return False
+        return self.verify_and_transfer(path, value)
 
-        fees: float = 0
-        for i in range(0, len(path) - 1):
-            current_node, next_node = path[i], path[i + 1]
-            try:
-                current_node.transact(next_node, value)
-            except Exception:
-                raise Exception("Failed to transact between node {0} and node {1} in the path".format(i, i + 1))
+    def verify_and_transfer(self, path: List[Node], value: float) -> bool:
+        """
+        Verify the path and transfer value along it, with the value and the fees of every hop computed once, and the
+        channel of every hop looked up once. Same as verify_path followed by transferring value hop by hop.
+        :param path:
+        :param value:
+        :return: Whether the transfer succeeded.
+        """
+        if value < 0:
+            raise ValueError("Tried to send negative value: ", value)
 
-            # Deduct the fees from value for the next hop transaction
-            value, fees = self.deduct_fees_from_value(value)
-            self.sum_relays_balances += fees
+        hop_values, hop_fees = self.calculate_hop_schedule(value)
+        hops = self.verify_path_hops(path, hop_values)
+        if hops is None:
+            return False
+        self.transfer_along_path(hops, hop_values, hop_fees)
+        return True
 
-        # The fees added to self.fees_collected in the last iteration of the loop above shouldn't be collected.
-        self.sum_relays_balances -= fees
+    def calculate_hop_schedule(self, value: float) -> Tuple[List[float], List[float]]:
+        """
+        The values and fees of the hops of a path, which only depend on the value sent.
+        :param value:
+        :return: The value sent in each hop of a path, followed by the value left after the last hop, and the fees
+         deducted in each hop.
+        """
+        hop_values: List[float] = [value]
+        hop_fees: List[float] = list()
+        for _ in range(self.configuration.hops_number + 3):
+            value, fees = self.deduct_fees_from_value(value)
+            hop_values.append(value)
+            hop_fees.append(fees)
+        return hop_values, hop_fees
 
-        return True
+    def transact_batch(self, transaction_values: Sequence[float]) -> Tuple[Sequence[bool], Sequence[float]]:
+        """
+        Perform a transaction between a random pair of clients for each value, in order.
+        :param transaction_values:
+        :return: Whether each transaction succeeded, and the relays mean balance after each transaction.
+        """
+        successes: List[bool] = list()
+        mean_balances: List[float] = list()
+        for value in transaction_values:
+            source_client, target_client = self.sample_client_pair()
+            successes.append(self.transact(source_client, target_client, value))
+            mean_balances.append(self.get_relays_mean_balance())
+        return successes, mean_balances
 
     def calculate_value_with_cumulative_fees(self, value: float) -> float:
         """
@@ -161,11 +475,11 @@ class LightningNetwork:
         :param target_client:
         :return:
         """
-        first_relay = random.sample(source_client.relays, 1)
-        target_relay = random.sample(target_client.relays, 1)
+        first_relay = self.random_stream.choice(source_client.relays)
+        target_relay = self.random_stream.choice(target_client.relays)
 
-        middle_relays = random.sample(self.relays - set(first_relay + target_relay), self.configuration.hops_number)
-        return [source_client] + first_relay + middle_relays + target_relay + [target_client]
+        middle_relays = self.sample_relays(self.configuration.hops_number, {first_relay, target_relay})
+        return [source_client, first_relay] + middle_relays + [target_relay, target_client]
 
     def verify_path(self, path: List[Node], value: float) -> bool:
         """
@@ -180,24 +494,72 @@ class LightningNetwork:
         if self.configuration.is_liquidity_assumed:
             return True
 
+        return self.verify_path_hops(path, self.calculate_hop_schedule(value)[0]) is not None
+
+    def verify_path_hops(self, path: List[Node], hop_values: List[float]) -> Optional[List[Tuple[Channel, bool]]]:
+        """
+        Check that the sender of every hop has the value of the hop in its channel, and count a failure in
+        fail_histogram at the first hop which doesn't.
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :return: The channel of every hop and whether its sender is the first node of the channel, or None if a hop
+         failed.
+        """
+        is_liquidity_assumed: bool = self.configuration.is_liquidity_assumed
+        hops: List[Tuple[Channel, bool]] = list()
         for i in range(0, len(path) - 1):
-            current_node, next_node = path[i], path[i + 1]
-            channel = current_node.channels[next_node]
+            current_node = path[i]
+            channel = self.get_channel(current_node, path[i + 1])
+            is_sender_node1: bool = channel.node1 == current_node
 
-            current_node_balance_in_channel = channel.balance1 if channel.node1 == current_node else channel.balance2
-            if value > current_node_balance_in_channel:
+            current_node_balance_in_channel = channel.balance1 if is_sender_node1 else channel.balance2
+            if not is_liquidity_assumed and hop_values[i] > current_node_balance_in_channel:
                 self.fail_histogram[i] += 1
-                return False
-
-            # Deduct the fees from value for the next hop transaction
-            value, fees = self.deduct_fees_from_value(value)
+                return None
+            hops.append((channel, is_sender_node1))
+        return hops
 
-        return True
+    def transfer_along_path(self, hops: List[Tuple[Channel, bool]], hop_values: List[float], hop_fees: List[float]):
+        """
+        Transfer the value of every hop in its channel, from its sender to its receiver, and collect the fees.
+        :param hops: See verify_path_hops.
+        :param hop_values: See calculate_hop_schedule.
+        :param hop_fees: See calculate_hop_schedule.
+        :return:
+        """
+        sum_relays_balances: float = self.sum_relays_balances
+        for (channel, is_sender_node1), value, fees in zip(hops, hop_values, hop_fees):
+            if is_sender_node1:
+                channel.balance1 -= value
+                channel.balance2 += value
+                channel.node1.update_ledger(-value)
+                channel.node2.update_ledger(value)
+            else:
+                channel.balance2 -= value
+                channel.balance1 += value
+                channel.node2.update_ledger(-value)
+                channel.node1.update_ledger(value)
+            sum_relays_balances += fees
+
+        # The fees of the last hop shouldn't be collected.
+        self.sum_relays_balances = sum_relays_balances - hop_fees[len(hops) - 1]
 
-    # TODO: remove this func
     def get_relays_balances(self) -> List[float]:
         """
 
+        :return:
+        """
+        return self.relays_balance_ledger.get_balances().tolist()
+
+    def get_relays_balances_view(self) -> np.ndarray:
+        """
+        :return: Read-only view of the relays balances, in the order of self.relays, without copying them.
+        """
+        return self.relays_balance_ledger.get_balances()
+
+    def calculate_relays_balances(self) -> List[float]:
+        """
+        Calculate the relays balances by scanning all of their channels, in O(R^2) for the full mesh.
         :return:
         """
         relay_to_funds: Dict[Relay, float] = dict()
@@ -207,14 +569,65 @@ class LightningNetwork:
                 balance_in_channel = channel.balance1 if channel.node1 == relay else channel.balance2
                 relay_to_funds[relay] += balance_in_channel
 
+            if self.configuration.is_construction_lazy:
+                # A channel which wasn't created yet holds its default balances, so its only effect is the channel cost
+                # paid by its creator.
+                created_channels = sum(1 for other_node in relay.channels
+                                       if isinstance(other_node, Relay) and other_node.node_id < relay.node_id)
+                relay_to_funds[relay] -= (relay.node_id - created_channels) * self.configuration.channel_cost
+
         return list(relay_to_funds.values())
 
+    def get_path_counters(self) -> List[int]:
+        """
+
+        :return: The counters of the path searches, in the order of PATH_COUNTERS.
+        """
+        return [self.path_counters[counter] for counter in PATH_COUNTERS]
+
     def get_relays_mean_balance(self) -> float:
         """
         :return: Returns the mean profit of the relays from transaction fees.
         """
         return self.sum_relays_balances / len(self.relays)
 
+    def get_memory_report(self) -> Dict[str, float]:
+        """
+        :return: The memory footprint of the network: the number of nodes and channels, the average bytes per node and
+         per channel, and the total bytes of the network.
+        """
+        nodes: List[Node] = list(self.relays) + [client for client in self.clients if client is not None]
+        channels: Dict[int, Channel] = {id(channel): channel for node in nodes for channel in node.channels.values()}
+
+        nodes_bytes: int = sum(sys.getsizeof(node) + sys.getsizeof(node.channels) for node in nodes)
+        nodes_bytes += sum(sys.getsizeof(node.relays) for node in nodes if isinstance(node, Client))
+        channels_bytes: int = sum(sys.getsizeof(channel) + sys.getsizeof(channel.balance1) +
+                                  sys.getsizeof(channel.balance2) for channel in channels.values())
+        network_bytes: int = sys.getsizeof(self.relays) + sys.getsizeof(self.clients) + \
+            sys.getsizeof(self.fail_histogram) + self.relays_balance_ledger.get_balances().nbytes
+
+        return self.create_memory_report(len(nodes), nodes_bytes, len(channels), channels_bytes, network_bytes)
+
+    @staticmethod
+    def create_memory_report(nodes_count: int, nodes_bytes: int, channels_count: int, channels_bytes: int,
+                             network_bytes: int) -> Dict[str, float]:
+        """
+
+        :param nodes_count:
+        :param nodes_bytes:
+        :param channels_count:
+        :param channels_bytes:
+        :param network_bytes: Bytes used by the network which don't belong to a node or a channel.
+        :return:
+        """
+        return {
+            'nodes_count': nodes_count,
+            'channels_count': channels_count,
+            'bytes_per_node': nodes_bytes / nodes_count if nodes_count > 0 else 0,
+            'bytes_per_channel': channels_bytes / channels_count if channels_count > 0 else 0,
+            'total_bytes': nodes_bytes + channels_bytes + network_bytes
+        }
+
     def calc_construction_price(self) -> float:
         """
 
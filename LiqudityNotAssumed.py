@@ -1,19 +1,37 @@
-from LightningNetwork import LightningNetworkConfiguration
-from LightningNetwork import LightningNetwork
-from typing import Tuple, List, Dict
-from LogNormal import LogNormal
-import random
+from LightningNetwork import EVENT_ENGINE, PATH_COUNTERS, UNROUTABLE, LightningNetworkConfiguration, \
+    get_fail_histogram_length
+from typing import Tuple, List, Dict, Any, Callable
+from TransactionSamples import create_transaction_samples, get_transaction_samples_hashes
+from EventLightningNetwork import EVENT_METRICS
+from Simulation import RepetitionResult, SimulationTask, create_network_configuration, run_simulation_task
+from SimulationConfiguration import SimulationConfiguration
 from itertools import product
+from contextlib import contextmanager
+import json
 import os
+import subprocess
+import sys
 from datetime import datetime
 from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import AsyncResult
 import tqdm
-import istarmap
-from statistics import mean
-from util import plot_graphs, plot_histogram, plot_freq, store_results, SimulationConfiguration
-import math
+import numpy as np
+from ResultCache import ResultCache, get_result_key
+from ResultStore import ResultStore, create_result_store, load_result_store
+from AdaptiveRepetitions import get_required_repetitions_count
+from Recording import get_checkpoints
+from WorkQueue import WorkQueue, CLAIM_RENEWAL_INTERVAL
 import Configuration
 
+# The folder of the result store of a sweep, in the folder of the sweep.
+RESULT_STORE_DIRECTORY_NAME: str = 'result_store'
+# The tasks of a sweep run on a multiprocessing pool, or on the workers of a work queue, see create_task_runner.
+POOL_EXECUTION: str = 'pool'
+QUEUE_EXECUTION: str = 'queue'
+EXECUTION_MODES: Tuple[str, ...] = (POOL_EXECUTION, QUEUE_EXECUTION)
+# The script of a work queue worker, see worker.py.
+WORKER_SCRIPT_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'worker.py')
+
 
 def run_simulations_and_plot_graphs():
     """
@@ -25,6 +43,19 @@ def run_simulations_and_plot_graphs():
     number_of_relays: int = Configuration.NUMBER_OF_RELAYS
     number_of_clients: int = Configuration.NUMBER_OF_CLIENTS
     number_of_relays_per_client: int = Configuration.NUMBER_OF_RELAYS_PER_CLIENT
+    engine: str = Configuration.ENGINE
+    transaction_batch_size: int = Configuration.TRANSACTION_BATCH_SIZE
+    is_construction_lazy: bool = Configuration.LAZY_CONSTRUCTION
+    topology: str = Configuration.TOPOLOGY
+    relay_degree: int = Configuration.RELAY_DEGREE
+    topology_path: str = Configuration.TOPOLOGY_PATH
+    is_path_capacity_aware: bool = Configuration.CAPACITY_AWARE_PATHS
+    max_payment_attempts: int = Configuration.MAX_PAYMENT_ATTEMPTS
+    arrival_process: str = Configuration.ARRIVAL_PROCESS
+    arrival_rate: float = Configuration.ARRIVAL_RATE
+    mean_hold_time: float = Configuration.MEAN_HOLD_TIME
+    recording_policy: str = Configuration.RECORDING_POLICY
+    recording_resolution: int = Configuration.RECORDING_RESOLUTION
 
     # 0.5M, 10M and 100M Satoshies.
     r2r_channel_balances: List[float] = Configuration.R2R_CHANNEL_BALANCES
@@ -33,181 +64,350 @@ def run_simulations_and_plot_graphs():
     transaction_proportional_fees: List[float] = Configuration.TRANSACTION_PROPORTIONAL_FEES
     transactions_num: int = Configuration.TRANSACTION_NUM
     avg_across_count: int = Configuration.AVG_ACROSS_COUNT
-
-    # We need to make sure that every configuration is simulated on the same list of transaction values in order to
-    # compare between them correctly.
-    transaction_samples: List[List[float]] = [LogNormal(size=transactions_num).get_samples()
-                                              for _ in range(avg_across_count)]
-
-    configurations = product(r2r_channel_balances, r2c_channel_balances, transaction_proportional_fees)
-    groups = [(r2c_balance,
-               r2r_balance,
-               transaction_proportional_fee,
-               channel_cost,
-               hops_number,
-               number_of_relays,
-               number_of_clients,
-               number_of_relays_per_client,
-               transaction_samples) for r2r_balance, r2c_balance, transaction_proportional_fee in configurations]
-
-    if not os.path.exists('results'):
-        os.mkdir('results')
-
-    print("Running configurations in parallel...")
-    with Pool(int(Configuration.CPU_NUM_RATIO * cpu_count())) as pool:
-        results = list(tqdm.tqdm(pool.istarmap(run_simulation, groups, chunksize=1), total=len(groups)))
-
-    configuration_to_avg_mean_balances: Dict[SimulationConfiguration, List[float]]\
-        = {configuration: avg_mean_balances
-           for configuration, avg_mean_balances, avg_fail_rates, avg_fail_histogram, relays_balances in results}
-    configuration_to_avg_fail_rates: Dict[SimulationConfiguration, List[float]]\
-        = {configuration: avg_fail_rates
-           for configuration, avg_mean_balances, avg_fail_rates, avg_fail_histogram, relays_balances in results}
-    configuration_to_avg_fail_histograms: Dict[SimulationConfiguration, List[int]] =\
-        {configuration: avg_fail_histogram
-         for configuration, avg_mean_balances, avg_fail_rates, avg_fail_histogram, relays_balances in results}
-    configuration_to_relays_balances: Dict[SimulationConfiguration, List[int]] =\
-        {configuration: sorted(relays_balances)
-         for configuration, avg_mean_balances, avg_fail_rates, avg_fail_histogram, relays_balances in results}
+    is_adaptive: bool = Configuration.ADAPTIVE_REPETITIONS
+    max_repetitions_count: int = Configuration.MAX_REPETITIONS_COUNT if is_adaptive else avg_across_count
+    standard_error_targets: Tuple[float, float] = (Configuration.MEAN_BALANCE_STANDARD_ERROR_TARGET,
+                                                   Configuration.FAIL_RATE_STANDARD_ERROR_TARGET)
+    transaction_samples_seed: int = Configuration.TRANSACTION_SAMPLES_SEED
+    simulation_seed: int = Configuration.SIMULATION_SEED
+    collect_simulation_stats: bool = Configuration.COLLECT_SIMULATION_STATS
+    profile_directory: str = Configuration.PROFILE_DIRECTORY
+    reuse_networks: bool = Configuration.REUSE_NETWORKS
+    execution_mode: str = Configuration.EXECUTION_MODE
+    if execution_mode not in EXECUTION_MODES:
+        raise ValueError("Unknown execution mode: ", execution_mode)
+    if execution_mode == QUEUE_EXECUTION and Configuration.QUEUE_CLAIM_LEASE_SECONDS <= 2 * CLAIM_RENEWAL_INTERVAL:
+        raise ValueError("The claim lease must be longer than two renewal intervals of the workers: ",
+                         Configuration.QUEUE_CLAIM_LEASE_SECONDS)
+    if max_repetitions_count < avg_across_count:
+        raise ValueError("Max repetitions count must be at least the average across count: ", max_repetitions_count)
+    if reuse_networks and is_construction_lazy:
+        raise ValueError("Networks which are constructed lazily can't be reused")
 
     now = datetime.now()
     current_date_time = now.strftime("%Y-%m-%d %H-%M-%S")
-    subdirectory_name = "t_nu-" + str(transactions_num) + " avg_across-" + str(avg_across_count) + " time-" \
+    avg_across_name = str(avg_across_count) + ("-" + str(max_repetitions_count) if is_adaptive else "")
+    subdirectory_name = "t_nu-" + str(transactions_num) + " avg_across-" + avg_across_name + " time-" \
                         + str(current_date_time)
     plot_path = os.path.join('results', subdirectory_name)
+    os.makedirs(plot_path, exist_ok=True)
+
+    # We need to make sure that every configuration is simulated on the same list of transaction values in order to
+    # compare between them correctly. The samples are generated once into a file which the workers memory-map, so only
+    # its absolute path, which workers in other folders can open too, is sent to them. There is a sample for every
+    # repetition a configuration may need.
+    transaction_samples_path: str = os.path.abspath(create_transaction_samples(
+        os.path.join(plot_path, 'transaction_samples.npy'), max_repetitions_count, transactions_num,
+        transaction_samples_seed))
+
+    # The network configuration of every configuration, by (r2r, r2c, fee).
+    network_configurations: Dict[tuple, LightningNetworkConfiguration] = {
+        (r2r_balance, r2c_balance, transaction_proportional_fee): create_network_configuration(
+            r2c_balance=r2c_balance,
+            r2r_balance=r2r_balance,
+            transaction_proportional_fee=transaction_proportional_fee,
+            channel_cost=channel_cost,
+            hops_number=hops_number,
+            number_of_relays=number_of_relays,
+            number_of_clients=number_of_clients,
+            number_of_relays_per_client=number_of_relays_per_client,
+            engine=engine,
+            transaction_batch_size=transaction_batch_size,
+            is_construction_lazy=is_construction_lazy,
+            topology=topology,
+            relay_degree=relay_degree,
+            topology_path=topology_path,
+            is_path_capacity_aware=is_path_capacity_aware,
+            max_payment_attempts=max_payment_attempts,
+            arrival_process=arrival_process,
+            arrival_rate=arrival_rate,
+            mean_hold_time=mean_hold_time)
+        for r2r_balance, r2c_balance, transaction_proportional_fee
+        in product(r2r_channel_balances, r2c_channel_balances, transaction_proportional_fees)}
+
+    def create_task(configuration_key: tuple, repetition: int) -> SimulationTask:
+        return SimulationTask(network_configurations[configuration_key], transaction_samples_path, repetition,
+                              recording_policy, recording_resolution, simulation_seed,
+                              collect_simulation_stats=collect_simulation_stats, profile_directory=profile_directory,
+                              reuse_networks=reuse_networks)
+
+    # Every (configuration, repetition) pair is a task, and the graphs of a (r2r, r2c) pair are plotted as soon as the
+    # last of its tasks completes. In adaptive mode, once the scheduled repetitions of a configuration complete, more
+    # are scheduled until the standard errors of its final mean balance and fail rate drop below their targets.
+    tasks: List[SimulationTask] = [create_task(configuration_key, repetition)
+                                   for configuration_key in network_configurations
+                                   for repetition in range(avg_across_count)]
+    scheduled_repetitions_counts: Dict[tuple, int] = {configuration_key: avg_across_count
+                                                      for configuration_key in network_configurations}
+    next_tasks: List[SimulationTask] = list()
+
+    # The results of every repetition are written to a single result store of the sweep, which the graphs are plotted
+    # from, and which can be loaded later to plot them again.
+    result_store: ResultStore = create_result_store(
+        os.path.join(plot_path, RESULT_STORE_DIRECTORY_NAME),
+        r2r_channel_balances,
+        r2c_channel_balances,
+        transaction_proportional_fees,
+        max_repetitions_count,
+        get_checkpoints(transactions_num, recording_policy, recording_resolution),
+        get_fail_histogram_length(hops_number),
+        number_of_relays,
+        parameters=dict(channel_cost=channel_cost, hops_number=hops_number, number_of_relays=number_of_relays,
+                        number_of_clients=number_of_clients, number_of_relays_per_client=number_of_relays_per_client,
+                        transactions_num=transactions_num, transaction_samples_seed=transaction_samples_seed,
+                        simulation_seed=simulation_seed, topology=topology, relay_degree=relay_degree,
+                        topology_path=topology_path, is_path_capacity_aware=is_path_capacity_aware,
+                        max_payment_attempts=max_payment_attempts, arrival_process=arrival_process,
+                        arrival_rate=arrival_rate, mean_hold_time=mean_hold_time,
+                        is_adaptive=is_adaptive,
+                        standard_error_targets=list(standard_error_targets)),
+        event_metrics=EVENT_METRICS if engine == EVENT_ENGINE else None,
+        path_counters=PATH_COUNTERS)
+
+    # The graphs of a (r2r, r2c) pair are rendered by a separate pool as soon as all of its configurations complete,
+    # while the simulations of the other pairs go on.
+    render_pool: Pool = None
+    if Configuration.RENDERING_PROCESSES_NUM > 0:
+        # plot_results selects the headless backend itself, so the plotting stack is only imported when rendering.
+        render_pool = Pool(Configuration.RENDERING_PROCESSES_NUM)
+    render_results: List[AsyncResult] = list()
+    # The SimulationStats of every repetition, if they are collected.
+    repetitions_stats: List[Dict[str, Any]] = list()
+
+    def collect_repetition_result(repetition_result: RepetitionResult):
+        configuration: SimulationConfiguration = repetition_result[0]
+        if repetition_result[7] is not None:
+            repetitions_stats.append(dict(r2r_balance=configuration.r2r_balance,
+                                          r2c_balance=configuration.r2c_balance,
+                                          transaction_proportional_fee=configuration.proportional_fee,
+                                          repetition=repetition_result[1],
+                                          stats=repetition_result[7]))
+        configuration_key = (configuration.r2r_balance, configuration.r2c_balance, configuration.proportional_fee)
+        result_store.store(*configuration_key, *repetition_result[1:6], event_series=repetition_result[8],
+                           path_counters=repetition_result[9])
+        repetitions_count = int(result_store.get_repetitions_counts(*configuration_key))
+        if repetitions_count < scheduled_repetitions_counts[configuration_key]:
+            return
+
+        if is_adaptive:
+            required_repetitions_count = get_required_repetitions_count(
+                repetitions_count, result_store.get_final_standard_errors(*configuration_key), standard_error_targets,
+                max_repetitions_count)
+            if required_repetitions_count > repetitions_count:
+                scheduled_repetitions_counts[configuration_key] = required_repetitions_count
+                next_tasks.extend(create_task(configuration_key, repetition)
+                                  for repetition in range(repetitions_count, required_repetitions_count))
+                return
+
+        result_store.finish(*configuration_key)
+        if not result_store.is_completed(configuration.r2r_balance, configuration.r2c_balance):
+            return
+
+        result_store.flush()
+        render_arguments = (result_store.directory, configuration.r2r_balance, configuration.r2c_balance, plot_path,
+                            Configuration.PLOT_FORMATS)
+        if render_pool is not None:
+            render_results.append(render_pool.apply_async(plot_results, render_arguments))
+        else:
+            plot_results(*render_arguments)
+
+    # Results of finished tasks are persisted as soon as they complete, keyed by the full network configuration, the
+    # seeds and the code version, so an interrupted or extended sweep only runs the missing tasks.
+    result_cache: ResultCache = None
+    if Configuration.RESULTS_CACHE_DIRECTORY is not None and transaction_samples_seed is not None \
+            and simulation_seed is not None:
+        result_cache = ResultCache(Configuration.RESULTS_CACHE_DIRECTORY)
 
-    for r2r, r2c in product(r2r_channel_balances, r2c_channel_balances):
-        current_configuration_to_avg_mean_balances = \
-            {key: configuration_to_avg_mean_balances[key] for key in configuration_to_avg_mean_balances.keys()
-             if key.r2r_balance == r2r and key.r2c_balance == r2c}
-        current_configuration_to_avg_fail_rates = \
-            {key: configuration_to_avg_fail_rates[key] for key in configuration_to_avg_fail_rates.keys()
-             if key.r2r_balance == r2r and key.r2c_balance == r2c}
-        current_configuration_to_avg_fail_histogram = \
-            {key: configuration_to_avg_fail_histograms[key] for key in configuration_to_avg_fail_histograms.keys()
-             if key.r2r_balance == r2r and key.r2c_balance == r2c}
-        current_configuration_to_relays_balances = \
-            {key: configuration_to_relays_balances[key] for key in configuration_to_relays_balances.keys()
-             if key.r2r_balance == r2r and key.r2c_balance == r2c}
-
-        avg_mean_balances_df = store_results(current_configuration_to_avg_mean_balances, plot_path,
-                                             "Avg Relay Mean Balances in Satoshi r2r {:.0E} r2c {:.0E}".format(r2r,
-                                                                                                               r2c))
-        fail_ratio_df = store_results(current_configuration_to_avg_fail_rates, plot_path,
-                                      "Fail Ratio r2r {:.0E} r2c {:.0E}".format(r2r, r2c))
-        plot_graphs([avg_mean_balances_df, fail_ratio_df], plot_path,
-                    ["Mean Balance in sat", "Fail Ratio"],
-                    ["Mean Balance of Relays", "Fail Ratio"],
-                    ["Mean Balance of Relays r2r {:.0E} r2c {:.0E}".format(r2r, r2c),
-                     "Fail Rate r2r {:.0E} r2c {:.0E}".format(r2r, r2c)],
-                    ["L(relay,relay)={:.0E}, L(relay,client)={:.0E}".format(r2r, r2c)] * 2)
-
-        avg_fail_histogram_df = store_results(current_configuration_to_avg_fail_histogram, plot_path,
-                                              "Fail Histogram r2r {:.0E} r2c {:.0E}".format(r2r, r2c), csv=False)
-        plot_histogram(avg_fail_histogram_df, plot_path, "Transaction Failure Histogram",
-                       "Fail Histogram r2r {:.0E} r2c {:.0E}".format(r2r, r2c),
-                       ["Failed at Hop (Index)", "Number of Fails"],
-                       "L(relay,relay)={:.0E}, L(relay,client)={:.0E}".format(r2r, r2c))
-
-        relays_balances_df = store_results(current_configuration_to_relays_balances, plot_path,
-                                           "Frequency of Relay Balances r2r {:.0E} r2c {:.0E}".format(r2r, r2c),
-                                           csv=False)
-        plot_freq(relays_balances_df, plot_path, "Frequency of Relay Balances",
-                  "Frequency of Relay Balances r2r {:.0E} r2c {:.0E}".format(r2r, r2c),
-                  ["Relay Balance", "Frequency"],
-                  "L(relay,relay)={:.0E}, L(relay,client)={:.0E}".format(r2r, r2c))
-
-
-def calc_simulation_results(
-        network_configuration: LightningNetworkConfiguration,
-        transaction_values: List[float]
-) -> (List[float], List[float], List[int], List[float]):
+    # The samples depend on the number of transactions as well as on their seed, so the result of a repetition is also
+    # keyed by the hash of its sample.
+    transaction_samples_hashes: List[str] = get_transaction_samples_hashes(transaction_samples_path)
+
+    def get_task_key(task: SimulationTask) -> str:
+        return get_result_key(task.network_configuration, transaction_samples_seed, task.repetition,
+                              transactions_num=transactions_num,
+                              transaction_sample_hash=transaction_samples_hashes[task.repetition],
+                              recording_policy=recording_policy, recording_resolution=recording_resolution,
+                              simulation_seed=simulation_seed, collect_simulation_stats=collect_simulation_stats,
+                              reuse_networks=reuse_networks)
+
+    print("Running configurations in parallel...")
+    with create_task_runner(execution_mode, get_task_key) as run_tasks:
+        # Every round runs the tasks the previous round scheduled, which only adaptive mode does.
+        while tasks:
+            pending_tasks = list()
+            for task in tasks:
+                cached_result: RepetitionResult = result_cache.load(get_task_key(task)) \
+                    if result_cache is not None else None
+                if cached_result is None:
+                    pending_tasks.append(task)
+                else:
+                    collect_repetition_result(cached_result)
+            print("{0} of {1} tasks were loaded from the results cache".format(len(tasks) - len(pending_tasks),
+                                                                              len(tasks)))
+
+            for task, repetition_result in tqdm.tqdm(run_tasks(pending_tasks), total=len(pending_tasks)):
+                if result_cache is not None:
+                    result_cache.store(get_task_key(task), repetition_result)
+                collect_repetition_result(repetition_result)
+
+            tasks = list(next_tasks)
+            next_tasks.clear()
+
+    if repetitions_stats:
+        repetitions_stats.sort(key=lambda stats: (stats['r2r_balance'], stats['r2c_balance'],
+                                                  stats['transaction_proportional_fee'], stats['repetition']))
+        with open(os.path.join(plot_path, 'simulation_stats.json'), 'w') as stats_file:
+            json.dump(repetitions_stats, stats_file, indent=4)
+
+    print("Rendering remaining graphs...")
+    for render_result in render_results:
+        # Raises the exception of a failed rendering, if any.
+        render_result.get()
+    if render_pool is not None:
+        render_pool.close()
+        render_pool.join()
+
+
+@contextmanager
+def create_task_runner(execution_mode: str, get_task_key: Callable[[SimulationTask], str]):
     """
+    In pool mode, the tasks run on a multiprocessing pool of CPU_NUM_RATIO of the cores. In queue mode, they're put in
+    the work queue in WORK_QUEUE_DIRECTORY, and run by QUEUE_LOCAL_WORKERS_NUM worker processes this function starts,
+    and by any worker started separately on the queue, see worker.py, which are all stopped when the sweep ends. Tasks
+    whose workers stop renewing their claims for QUEUE_CLAIM_LEASE_SECONDS run again, and if this function starts
+    workers, the sweep fails once all of them exit before the tasks complete.
+    :param execution_mode: One of EXECUTION_MODES.
+    :param get_task_key: A unique key of a task, which names its files in the work queue.
+    :return: A function which runs simulation tasks, see run_simulation_task, and yields every task with its result as
+     soon as it completes.
+    """
+    processes_num: int = max(1, int(Configuration.CPU_NUM_RATIO * cpu_count()))
+    if execution_mode == POOL_EXECUTION:
+        with Pool(processes_num) as pool:
+            yield lambda tasks: pool.imap_unordered(run_simulation_task, tasks)
+        return
+
+    work_queue: WorkQueue = WorkQueue(Configuration.WORK_QUEUE_DIRECTORY)
+    work_queue.start()
+    local_workers_num: int = Configuration.QUEUE_LOCAL_WORKERS_NUM \
+        if Configuration.QUEUE_LOCAL_WORKERS_NUM is not None else processes_num
+    workers: List[subprocess.Popen] = [subprocess.Popen([sys.executable, WORKER_SCRIPT_PATH, work_queue.directory,
+                                                         '--wait'])
+                                       for _ in range(local_workers_num)]
+
+    def are_workers_alive() -> bool:
+        return any(worker.poll() is None for worker in workers)
+
+    try:
+        yield lambda tasks: work_queue.execute(tasks, get_task_key, Configuration.QUEUE_CLAIM_LEASE_SECONDS,
+                                               are_workers_alive if workers else None)
+    finally:
+        work_queue.stop()
+        for worker in workers:
+            worker.wait()
 
-    :param network_configuration:
-    :param transaction_values:
+
+def plot_results(result_store_directory: str, r2r: float, r2c: float, plot_path: str, plot_formats: List[str]):
+    """
+    Plot the graphs of the configurations of a (r2r, r2c) pair from a result store, headless. Only the slice of the pair
+    is read from the store.
+    :param result_store_directory: See ResultStore.
+    :param r2r:
+    :param r2c:
+    :param plot_path:
+    :param plot_formats: See util.save_figure.
     :return:
     """
-    lightning_network: LightningNetwork = LightningNetwork(network_configuration)
+    # Imported here, so the simulation processes never import the plotting stack.
+    import pandas as pd
+    from util import plot_graphs, plot_histogram, plot_freq, use_headless_backend
+    use_headless_backend()
+    result_store: ResultStore = load_result_store(result_store_directory)
+    index = result_store.get_index(r2r, r2c)
+    configurations: List[SimulationConfiguration] = [SimulationConfiguration(r2r, r2c, 0, fee)
+                                                     for fee in result_store.transaction_proportional_fees]
 
-    mean_balances: List[float] = [0] * (len(transaction_values) + 1)
-    mean_balances[0] = lightning_network.get_relays_mean_balance()
+    # Averages across the stored repetitions of each configuration, with a column for each configuration.
+    avg_mean_balances_df = pd.DataFrame(
+        result_store.get_mean_across_repetitions(result_store.mean_balances, r2r, r2c).T,
+        index=result_store.checkpoints, columns=configurations)
+    fail_ratio_df = pd.DataFrame(result_store.get_mean_across_repetitions(result_store.fail_rates, r2r, r2c).T,
+                                 index=result_store.checkpoints, columns=configurations)
+    repetitions_counts: np.ndarray = result_store.get_repetitions_counts(r2r, r2c)
+    avg_fail_histogram_df = pd.DataFrame(
+        (result_store.fail_histograms[index].sum(axis=1) // repetitions_counts[:, np.newaxis]).T,
+        columns=configurations)
+    if result_store.path_counters is not None:
+        # Stores with path counters count the transactions for which no path was found in the last bucket.
+        avg_fail_histogram_df.index = list(range(len(avg_fail_histogram_df) - 1)) + [UNROUTABLE]
+    relays_balances_df = pd.DataFrame(
+        np.sort(result_store.get_mean_across_repetitions(result_store.relays_balances, r2r, r2c), axis=1).T,
+        columns=configurations)
 
-    num_fails = 0
-    fail_rates: List[float] = [0] * (len(transaction_values) + 1)
+    # The standard errors of the averages at every checkpoint, stored next to the graphs.
+    mean_balances_standard_errors_df = pd.DataFrame(
+        result_store.get_standard_errors_across_repetitions(result_store.mean_balances, r2r, r2c).T,
+        index=result_store.checkpoints, columns=configurations)
+    fail_rates_standard_errors_df = pd.DataFrame(
+        result_store.get_standard_errors_across_repetitions(result_store.fail_rates, r2r, r2c).T,
+        index=result_store.checkpoints, columns=configurations)
+    mean_balances_standard_errors_df.to_pickle(os.path.join(
+        plot_path, "Standard Error of Avg Relay Mean Balances r2r {:.0E} r2c {:.0E}.pickle".format(r2r, r2c)))
+    fail_rates_standard_errors_df.to_pickle(os.path.join(
+        plot_path, "Standard Error of Fail Ratio r2r {:.0E} r2c {:.0E}.pickle".format(r2r, r2c)))
+    if result_store.path_counters is not None:
+        # The averages of the path counters across the repetitions, with a row for each counter.
+        path_counters_df = pd.DataFrame(
+            result_store.get_mean_across_repetitions(result_store.path_counters, r2r, r2c).T,
+            index=result_store.path_counter_names, columns=configurations)
+        path_counters_df.to_pickle(os.path.join(
+            plot_path, "Avg Path Counters r2r {:.0E} r2c {:.0E}.pickle".format(r2r, r2c)))
 
-    # Make index start with 1
-    for i, value in enumerate(transaction_values, 1):
-        c1, c2 = random.sample(lightning_network.clients, 2)
+    plot_graphs([avg_mean_balances_df, fail_ratio_df], plot_path,
+                ["Mean Balance in sat", "Fail Ratio"],
+                ["Mean Balance of Relays", "Fail Ratio"],
+                ["Mean Balance of Relays r2r {:.0E} r2c {:.0E}".format(r2r, r2c),
+                 "Fail Rate r2r {:.0E} r2c {:.0E}".format(r2r, r2c)],
+                ["L(relay,relay)={:.0E}, L(relay,client)={:.0E}".format(r2r, r2c)] * 2,
+                formats=plot_formats)
 
-        if not lightning_network.transact(c1, c2, value):
-            num_fails += 1
-        fail_rates[i] = num_fails / i
-        mean_balances[i] = lightning_network.get_relays_mean_balance()
+    plot_histogram(avg_fail_histogram_df, plot_path, "Transaction Failure Histogram",
+                   "Fail Histogram r2r {:.0E} r2c {:.0E}".format(r2r, r2c),
+                   ["Failed at Hop (Index)", "Number of Fails"],
+                   "L(relay,relay)={:.0E}, L(relay,client)={:.0E}".format(r2r, r2c), formats=plot_formats)
 
-    return mean_balances, fail_rates, lightning_network.fail_histogram, lightning_network.get_relays_balances()
+    plot_freq(relays_balances_df, plot_path, "Frequency of Relay Balances",
+              "Frequency of Relay Balances r2r {:.0E} r2c {:.0E}".format(r2r, r2c),
+              ["Relay Balance", "Frequency"],
+              "L(relay,relay)={:.0E}, L(relay,client)={:.0E}".format(r2r, r2c), formats=plot_formats)
 
+    if result_store.event_series is None:
+        return
+    # The metrics of the event engine, like the throughput and the concurrent locks, over the transactions.
+    event_metric_dfs: List[pd.DataFrame] = list()
+    event_metric_names: List[str] = list()
+    for i, metric in enumerate(result_store.event_metrics):
+        if metric == 'time':
+            continue
+        event_metric_dfs.append(pd.DataFrame(
+            result_store.get_mean_across_repetitions(result_store.event_series[..., i], r2r, r2c).T,
+            index=result_store.checkpoints, columns=configurations))
+        event_metric_names.append(metric.replace('_', ' ').title())
+    plot_graphs(event_metric_dfs, plot_path, event_metric_names, event_metric_names,
+                ["{0} r2r {1:.0E} r2c {2:.0E}".format(name, r2r, r2c) for name in event_metric_names],
+                ["L(relay,relay)={:.0E}, L(relay,client)={:.0E}".format(r2r, r2c)] * len(event_metric_names),
+                formats=plot_formats)
 
-def run_simulation(r2c_balance,
-                   r2r_balance,
-                   transaction_proportional_fee,
-                   channel_cost,
-                   hops_number,
-                   number_of_relays,
-                   number_of_clients,
-                   number_of_relays_per_client,
-                   transaction_samples) \
-        -> Tuple[SimulationConfiguration, List[float], List[float], List[int], List[float]]:
-    """
 
-    :param r2c_balance:
-    :param r2r_balance:
-    :param transaction_proportional_fee:
-    :param channel_cost:
-    :param hops_number:
-    :param number_of_relays:
-    :param number_of_clients:
-    :param number_of_relays_per_client:
-    :param transaction_samples:
+def plot_result_store(plot_path: str, plot_formats: List[str] = None):
+    """
+    Plot the graphs of a past sweep again, from its result store.
+    :param plot_path: The folder of the sweep.
+    :param plot_formats: See util.save_figure.
     :return:
     """
-    network_configuration = LightningNetworkConfiguration(
-        default_balance_client_relay_channel_client=float('inf'),
-        default_balance_client_relay_channel_relay=r2c_balance,
-        default_balance_relay_relay_channel=r2r_balance,
-        channel_cost=channel_cost,
-        relay_transaction_fee=0,
-        transaction_proportional_fee=transaction_proportional_fee,
-        hops_number=hops_number,
-        is_liquidity_assumed=False,
-        add_fees_to_value=False,
-        number_of_relays=number_of_relays,
-        number_of_clients=number_of_clients,
-        number_of_relays_per_client=number_of_relays_per_client
-    )
-
-    mean_balances_results: List[List[float]] = list()
-    fail_rates_results: List[List[float]] = list()
-    fail_histogram_results: List[List[int]] = list()
-    relays_balances_results: List[List[float]] = list()
-
-    for i, transactions_values in enumerate(transaction_samples, 1):
-        mean_balances, fail_rates, fail_histogram, relays_balances = calc_simulation_results(
-            network_configuration=network_configuration,
-            transaction_values=transactions_values
-        )
-
-        mean_balances_results.append(mean_balances)
-        fail_rates_results.append(fail_rates)
-        fail_histogram_results.append(fail_histogram)
-        relays_balances_results.append(relays_balances)
-
-    avg_mean_balances: List[float] = [mean(elements) for elements in zip(*mean_balances_results)]
-    avg_fail_rates: List[float] = [mean(elements) for elements in zip(*fail_rates_results)]
-    avg_fail_histogram: List[int] = [math.floor(mean(elements)) for elements in zip(*fail_histogram_results)]
-    avg_relays_balances: List[float] = [mean(elements) for elements in zip(*relays_balances_results)]
-
-    configuration: SimulationConfiguration = SimulationConfiguration(r2r_balance, r2c_balance, 0,
-                                                                     transaction_proportional_fee)
-
-    return configuration, avg_mean_balances, avg_fail_rates, avg_fail_histogram, avg_relays_balances
+    result_store_directory: str = os.path.join(plot_path, RESULT_STORE_DIRECTORY_NAME)
+    result_store: ResultStore = load_result_store(result_store_directory)
+    for r2r, r2c in product(result_store.r2r_balances, result_store.r2c_balances):
+        if result_store.is_completed(r2r, r2c):
+            plot_results(result_store_directory, r2r, r2c, plot_path, plot_formats)
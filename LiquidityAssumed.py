@@ -1,7 +1,6 @@
 from LightningNetwork import LightningNetworkConfiguration
-from LightningNetwork import LightningNetwork
-from typing import Tuple, List
-import random
+from LightningNetwork import LightningNetwork, create_lightning_network, ANALYTIC_ENGINE
+from typing import Tuple
 import numpy as np
 
 
@@ -19,14 +18,17 @@ def is_error_smaller_than_epsilon(epsilon: float = 0.0001):
         transaction_proportional_fee=0,
         hops_number=3,
         is_liquidity_assumed=True,
+        add_fees_to_value=False,
         number_of_relays=100,
         number_of_clients=10000,
-        number_of_relays_per_client=1
+        number_of_relays_per_client=1,
+        engine=ANALYTIC_ENGINE,
+        transaction_batch_size=10 ** 5
     )
 
     error: float = calculate_error(
         network_configuration=configuration,
-        transactions_count=1000,
+        transactions_count=10 ** 6,
         transaction_value_range=(1., 2.)
     )
 
@@ -34,38 +36,74 @@ def is_error_smaller_than_epsilon(epsilon: float = 0.0001):
 
 
 def calculate_error(network_configuration: LightningNetworkConfiguration, transactions_count: int,
-                    transaction_value_range: Tuple[float, float]):
+                    transaction_value_range: Tuple[float, float],
+                    random_generator: np.random.Generator = None):
     """
 
-    :param network_configuration:
+    :param network_configuration: With a transaction batch size, the transactions are performed in batches with
+     transact_batch, whose mean balances are the mean fee income of the relays, which is their mean balance when
+     liquidity is assumed. With the analytic engine, millions of transactions take seconds.
     :param transactions_count:
     :param transaction_value_range:
+    :param random_generator: The generator of the network and of the transaction values, unseeded if None.
     :return:
     """
-    lightning_network: LightningNetwork = LightningNetwork(network_configuration)
+    if random_generator is None:
+        random_generator = np.random.default_rng()
+    lightning_network: LightningNetwork = create_lightning_network(network_configuration, random_generator)
+    values = random_generator.uniform(transaction_value_range[0], transaction_value_range[1], transactions_count)
+
+    expected_relay_balances: np.ndarray = expected_relay_balance(network_configuration, transactions_count)
+
+    mean_relay_balances = np.empty(transactions_count + 1, dtype=np.float64)
+    mean_relay_balances[0] = lightning_network.relays_balance_ledger.get_mean()
+
+    batch_size: int = network_configuration.transaction_batch_size
+    if batch_size > 0:
+        for start in range(0, transactions_count, batch_size):
+            end = min(start + batch_size, transactions_count)
+            mean_relay_balances[start + 1:end + 1] = lightning_network.transact_batch(values[start:end])[1]
+    else:
+        for i in range(1, transactions_count + 1):
+            c1, c2 = lightning_network.sample_client_pair()
+            lightning_network.transact(c1, c2, float(values[i - 1]))
+
+            mean_relay_balances[i] = lightning_network.relays_balance_ledger.get_mean()
+
+    return float(np.mean(np.abs(expected_relay_balances - mean_relay_balances)))
+
 
-    expected_relay_balances: List[float] = expected_relay_balance(network_configuration, transactions_count)
+def calculate_relays_balances_distribution(network_configuration: LightningNetworkConfiguration,
+                                           transactions_count: int,
+                                           transaction_value_range: Tuple[float, float],
+                                           random_generator: np.random.Generator = None) -> np.ndarray:
+    """
+
+    :param network_configuration:
+    :param transactions_count:
+    :param transaction_value_range:
+    :param random_generator: The generator of the network and of the transaction values, unseeded if None.
+    :return: The balance of every relay after every transaction, as a (transactions_count + 1, relays) array.
+    """
+    if random_generator is None:
+        random_generator = np.random.default_rng()
+    lightning_network: LightningNetwork = create_lightning_network(network_configuration, random_generator)
+    values = random_generator.uniform(transaction_value_range[0], transaction_value_range[1], transactions_count)
 
-    initial_balances = lightning_network.get_relays_balances()
-    initial_mean_balance = float(np.mean(initial_balances, dtype=np.float64))
-    mean_relay_balances: List[float] = [0] * (transactions_count + 1)
-    mean_relay_balances[0] = initial_mean_balance
+    relays_balances = np.empty((transactions_count + 1, len(lightning_network.relays)), dtype=np.float64)
+    relays_balances[0] = lightning_network.get_relays_balances_view()
 
     for i in range(1, transactions_count + 1):
-        c1, c2 = random.sample(lightning_network.clients, 2)
-        value = random.uniform(transaction_value_range[0], transaction_value_range[1])
-        lightning_network.transact(c1, c2, value)
+        c1, c2 = lightning_network.sample_client_pair()
+        lightning_network.transact(c1, c2, float(values[i - 1]))
 
-        balances = lightning_network.get_relays_balances()
-        mean_balance = np.mean(balances, dtype=np.float64)
-        mean_relay_balances[i] = float(mean_balance)
+        relays_balances[i] = lightning_network.get_relays_balances_view()
 
-    errors = [abs(expected_relay_balances[j] - mean_relay_balances[j]) for j in range(len(expected_relay_balances))]
-    return float(np.mean(errors))
+    return relays_balances
 
 
 def expected_relay_balance(network_configuration: LightningNetworkConfiguration, transactions_count: int)\
-        -> List[float]:
+        -> np.ndarray:
     """
     Compute the expected relay balance with the analytic equation.
     :param network_configuration:
@@ -76,5 +114,5 @@ def expected_relay_balance(network_configuration: LightningNetworkConfiguration,
     hops = network_configuration.hops_number
     relays = network_configuration.number_of_relays
     channel_cost = network_configuration.channel_cost
-    return [(tx_num * tx_fee * (hops + 2)) * (1 / relays) - channel_cost * (relays - 1) / 2
-            for tx_num in range(transactions_count + 1)]
+    tx_num = np.arange(transactions_count + 1, dtype=np.float64)
+    return (tx_num * tx_fee * (hops + 2)) * (1 / relays) - channel_cost * (relays - 1) / 2
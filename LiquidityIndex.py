@@ -0,0 +1,107 @@
+from typing import List, Callable, Optional
+import math
+import numpy as np
+
+# The number of samples drawn by rejection before the candidates are scanned.
+REJECTION_SAMPLES: int = 8
+
+
+def get_bucket(balance: float) -> int:
+    """
+
+    :param balance:
+    :return: 0 for a balance below 1, otherwise the number of bits of its integer part, so every bucket above the
+     bucket of a value only holds balances larger than the value.
+    """
+    return max(math.frexp(balance)[1], 0)
+
+
+class LiquidityIndex:
+    def __init__(self, balances: np.ndarray):
+        """
+        The outgoing channels of every relay, bucketed by the power of two of the balance the relay holds in them, so
+        the channels which can carry a value are drawn without scanning all the channels of the relay. The balances are
+        owned by the network, which calls update whenever it changes one.
+        :param balances: The balance relay i holds in its channel with relay j is balances[i, j].
+        """
+        self.balances: np.ndarray = balances
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Bucket all the channels again, after the balances were all changed.
+        :return:
+        """
+        number_of_relays: int = len(self.balances)
+        # The exponents of np.frexp are the buckets of get_bucket.
+        self.channel_buckets: np.ndarray = np.maximum(np.frexp(self.balances)[1], 0)
+        # buckets[i][b] are the relays with which relay i has a channel in bucket b, and positions[i, j] is the position
+        # of relay j in its bucket of relay i.
+        self.buckets: List[List[List[int]]] = list()
+        self.positions: np.ndarray = np.zeros((number_of_relays, number_of_relays), dtype=np.int64)
+        buckets_count: int = int(self.channel_buckets.max(initial=0)) + 1
+        for relay in range(number_of_relays):
+            relay_buckets: List[List[int]] = [list() for _ in range(buckets_count)]
+            for other_relay, bucket in enumerate(self.channel_buckets[relay].tolist()):
+                if other_relay != relay:
+                    self.positions[relay, other_relay] = len(relay_buckets[bucket])
+                    relay_buckets[bucket].append(other_relay)
+            self.buckets.append(relay_buckets)
+
+    def update(self, relay: int, other_relay: int):
+        """
+        Move the channel to the bucket of its current balance, in O(1).
+        :param relay:
+        :param other_relay:
+        :return:
+        """
+        bucket = get_bucket(self.balances[relay, other_relay])
+        old_bucket = self.channel_buckets[relay, other_relay]
+        if bucket == old_bucket:
+            return
+
+        relay_buckets = self.buckets[relay]
+        # Remove the channel from its old bucket by moving the last channel of the bucket to its position.
+        old_bucket_relays = relay_buckets[old_bucket]
+        position = self.positions[relay, other_relay]
+        last_relay = old_bucket_relays.pop()
+        if last_relay != other_relay:
+            old_bucket_relays[position] = last_relay
+            self.positions[relay, last_relay] = position
+
+        while bucket >= len(relay_buckets):
+            relay_buckets.append(list())
+        self.positions[relay, other_relay] = len(relay_buckets[bucket])
+        relay_buckets[bucket].append(other_relay)
+        self.channel_buckets[relay, other_relay] = bucket
+
+    def sample(self, relay: int, value: float, is_allowed: Callable[[int], bool], random_stream) -> Optional[int]:
+        """
+        Draw a uniform relay among the relays in whose channel relay has at least value and which are allowed. Only the
+        buckets which may have such channels are drawn from, by rejection, and scanned if the rejections persist.
+        :param relay:
+        :param value:
+        :param is_allowed:
+        :param random_stream: See RandomStream.
+        :return: The drawn relay, or None if there is none.
+        """
+        relay_buckets = self.buckets[relay]
+        candidate_buckets = relay_buckets[min(get_bucket(value), len(relay_buckets)):]
+        candidates_count: int = sum(len(bucket_relays) for bucket_relays in candidate_buckets)
+        if candidates_count == 0:
+            return None
+
+        balances = self.balances[relay]
+        for _ in range(REJECTION_SAMPLES):
+            index = random_stream.randrange(candidates_count)
+            for bucket_relays in candidate_buckets:
+                if index < len(bucket_relays):
+                    break
+                index -= len(bucket_relays)
+            other_relay = bucket_relays[index]
+            if balances[other_relay] >= value and is_allowed(other_relay):
+                return other_relay
+
+        candidates = [other_relay for bucket_relays in candidate_buckets for other_relay in bucket_relays
+                      if balances[other_relay] >= value and is_allowed(other_relay)]
+        return random_stream.choice(candidates) if candidates else None
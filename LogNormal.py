@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 DESIRED_MIN: float = 100
 DESIRED_MAX: float = 3.5 * 10 ** 6
@@ -15,7 +14,9 @@ def test_plot(sample_size: int):
     :param sample_size:
     :return:
     """
-    sample = np.random.lognormal(mean=MEAN, sigma=SIGMA, size=sample_size)
+    # Imported here, so drawing samples doesn't import the plotting stack.
+    import matplotlib.pyplot as plt
+    sample = np.random.default_rng().lognormal(mean=MEAN, sigma=SIGMA, size=sample_size)
     sample = sample - min(sample)
     sample = sample / max(sample) * DESIRED_MAX
     sample = sample + DESIRED_MIN
@@ -35,7 +36,8 @@ class LogNormal:
                  mean: float = MEAN,
                  sigma: float = SIGMA,
                  desired_min: float = DESIRED_MIN,
-                 desired_max: float = DESIRED_MAX):
+                 desired_max: float = DESIRED_MAX,
+                 random_generator: np.random.Generator = None):
         """
 
         :param size:
@@ -43,8 +45,11 @@ class LogNormal:
         :param sigma:
         :param desired_min:
         :param desired_max:
+        :param random_generator: Generator to draw the samples with, unseeded if None.
         """
-        samples = np.random.lognormal(mean=mean, sigma=sigma, size=size)
+        if random_generator is None:
+            random_generator = np.random.default_rng()
+        samples = random_generator.lognormal(mean=mean, sigma=sigma, size=size)
         samples = samples - min(samples)
         samples = samples / max(samples) * desired_max
         samples = samples + desired_min
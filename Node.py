@@ -4,27 +4,31 @@ from typing import Dict
 
 
 class Node:
-    def __init__(self, network_configuration):
+    __slots__ = ('node_id', 'channels', 'balance')
+
+    def __init__(self, node_id: int):
         """
 
-        :param network_configuration:
+        :param node_id: The index of the node among the network's nodes of its kind (relays or clients).
         """
-        self.network_configuration = network_configuration
+        self.node_id: int = node_id
         self.channels: Dict[Node, Channel] = dict()
         self.balance: float = 0
 
-    def create_channel(self, owner_balance: float, other_owner: 'Node', other_owner_balance: float):
+    def create_channel(self, owner_balance: float, other_owner: 'Node', other_owner_balance: float,
+                       channel_cost: float):
         """
 
         :param owner_balance:
         :param other_owner:
         :param other_owner_balance:
+        :param channel_cost:
         :return:
         """
         if self.has_channel(other_owner):
             raise Exception("A channel with this other owner already exists")
 
-        new_channel = Channel(self, owner_balance, other_owner, other_owner_balance, self.network_configuration)
+        new_channel = Channel(self, owner_balance, other_owner, other_owner_balance, channel_cost)
 
         # Update both nodes with the new channel:
         self.channels[other_owner] = new_channel
@@ -38,17 +42,10 @@ class Node:
         """
         return node in self.channels.keys()
 
-    def transact(self, target: 'Node', value: float):
+    def update_ledger(self, value: float):
         """
-
-        :param target:
+        Record a change of value in the node's balance in its channels. Only relays keep track of it.
         :param value:
         :return:
         """
-        if not self.has_channel(target):
-            raise Exception("You cannot transact to this target without a channel!")
-        channel: Channel = self.channels[target]
-        channel.transact(self, value)
-
-
-
+        pass
@@ -0,0 +1,74 @@
+from typing import List, Sequence, Any
+import numpy as np
+
+BLOCK_SIZE: int = 4096
+
+
+class RandomStream:
+    def __init__(self, random_generator: np.random.Generator, block_size: int = BLOCK_SIZE):
+        """
+        Scalar random draws served from blocks of uniform samples drawn in bulk from a NumPy Generator, so drawing a
+        single number costs a list lookup instead of a call into the generator.
+        :param random_generator:
+        :param block_size:
+        """
+        self.random_generator: np.random.Generator = random_generator
+        self.block_size: int = block_size
+        self.__block: List[float] = list()
+        self.__position: int = 0
+
+    def random(self) -> float:
+        """
+        :return: A uniform float in [0, 1).
+        """
+        if self.__position == len(self.__block):
+            self.__block = self.random_generator.random(self.block_size).tolist()
+            self.__position = 0
+        value = self.__block[self.__position]
+        self.__position += 1
+        return value
+
+    def randrange(self, stop: int) -> int:
+        """
+
+        :param stop:
+        :return: A uniform integer in [0, stop).
+        """
+        if stop <= 0:
+            raise ValueError("empty range for randrange()")
+        return int(self.random() * stop)
+
+    def uniform(self, low: float, high: float) -> float:
+        """
+
+        :param low:
+        :param high:
+        :return:
+        """
+        return low + (high - low) * self.random()
+
+    def choice(self, sequence: Sequence[Any]) -> Any:
+        """
+
+        :param sequence:
+        :return:
+        """
+        return sequence[self.randrange(len(sequence))]
+
+    def sample(self, population: Sequence[Any], k: int) -> List[Any]:
+        """
+
+        :param population:
+        :param k:
+        :return: k distinct elements of the population, drawn by rejection.
+        """
+        if not 0 <= k <= len(population):
+            raise ValueError("Sample larger than population or is negative")
+        sampled_indices = set()
+        sampled: List[Any] = list()
+        while len(sampled) < k:
+            index = self.randrange(len(population))
+            if index not in sampled_indices:
+                sampled_indices.add(index)
+                sampled.append(population[index])
+        return sampled
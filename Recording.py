@@ -0,0 +1,36 @@
+from typing import List
+import numpy as np
+
+RECORD_EVERY_KTH: str = 'every'
+RECORD_LOG_SPACED: str = 'log'
+RECORDING_POLICIES = (RECORD_EVERY_KTH, RECORD_LOG_SPACED)
+
+
+def get_checkpoints(transactions_num: int, recording_policy: str, recording_resolution: int) -> List[int]:
+    """
+    The numbers of transactions after which the per-transaction time series are recorded, where 0 stands for the initial
+    state. The first and the last transactions are always recorded.
+    :param transactions_num:
+    :param recording_policy: RECORD_EVERY_KTH to record every recording_resolution transactions, or RECORD_LOG_SPACED to
+     record recording_resolution log-spaced checkpoints, but never fewer than the initial state, the first and the
+     last transactions.
+    :param recording_resolution:
+    :return: Sorted checkpoints.
+    """
+    if recording_resolution < 1:
+        raise ValueError("Recording resolution must be positive: ", recording_resolution)
+
+    if recording_policy == RECORD_EVERY_KTH:
+        checkpoints = list(range(0, transactions_num + 1, recording_resolution))
+        if checkpoints[-1] != transactions_num:
+            checkpoints.append(transactions_num)
+        return checkpoints
+
+    if recording_policy == RECORD_LOG_SPACED:
+        if transactions_num == 0:
+            return [0]
+        # At least two points, so the last transaction is recorded whatever the resolution.
+        log_spaced = np.geomspace(1, transactions_num, num=max(recording_resolution - 1, 2))
+        return [0] + np.unique(np.round(log_spaced).astype(np.int64)).tolist()
+
+    raise ValueError("Unknown recording policy: ", recording_policy)
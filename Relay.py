@@ -1,11 +1,23 @@
 from Node import Node
+from RelaysBalanceLedger import RelaysBalanceLedger
 
 
 class Relay(Node):
-    def __init__(self, network_configuration):
+    __slots__ = ('ledger',)
+
+    def __init__(self, node_id: int):
+        """
+
+        :param node_id: The index of the relay in the network, which is also its index in the relays balance ledger.
         """
+        super().__init__(node_id)
+        self.ledger: RelaysBalanceLedger = None
 
-        :param network_configuration:
+    def update_ledger(self, value: float):
         """
-        super().__init__(network_configuration)
 
+        :param value:
+        :return:
+        """
+        if self.ledger is not None:
+            self.ledger.add(self.node_id, value)
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class RelaysBalanceLedger:
+    def __init__(self, initial_balances):
+        """
+        Running total balance (on-chain and in channels) of every relay, indexed by the relay index.
+        :param initial_balances:
+        """
+        self.__balances: np.ndarray = np.array(initial_balances, dtype=np.float64)
+        self.__sum: float = float(np.sum(self.__balances))
+
+    def add(self, relay_index: int, value: float):
+        """
+
+        :param relay_index:
+        :param value:
+        :return:
+        """
+        self.__balances[relay_index] += value
+        self.__sum += value
+
+    def add_at(self, relay_indices: np.ndarray, values: np.ndarray):
+        """
+        Same as calling add for each pair of relay index and value, in order.
+        :param relay_indices:
+        :param values:
+        :return:
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        np.add.at(self.__balances, np.asarray(relay_indices).ravel(), values)
+        self.__sum = float(np.cumsum(np.concatenate(([self.__sum], values)))[-1])
+
+    def reset(self, balances):
+        """
+        Set the balances of all the relays in place, so whoever holds the ledger sees them.
+        :param balances:
+        :return:
+        """
+        self.__balances[:] = balances
+        self.__sum = float(np.sum(self.__balances))
+
+    def get_balances(self) -> np.ndarray:
+        """
+        :return: Read-only view of the relays balances.
+        """
+        balances = self.__balances.view()
+        balances.flags.writeable = False
+        return balances
+
+    def get_sum(self) -> float:
+        """
+
+        :return:
+        """
+        return self.__sum
+
+    def get_mean(self) -> float:
+        """
+
+        :return:
+        """
+        return self.__sum / len(self.__balances)
@@ -0,0 +1,91 @@
+from typing import Optional, Any
+import hashlib
+import json
+import os
+import pickle
+
+# Modules whose code determines the results of a simulation.
+SIMULATION_MODULES = ['Channel.py', 'Node.py', 'Relay.py', 'Client.py', 'RelaysBalanceLedger.py', 'LightningNetwork.py',
+                      'ArrayLightningNetwork.py', 'AnalyticLightningNetwork.py', 'LiqudityNotAssumed.py',
+                      'LogNormal.py', 'TransactionSamples.py', 'Recording.py', 'RandomStream.py', 'SimulationStats.py',
+                      'SparseLightningNetwork.py', 'Topology.py', 'LiquidityIndex.py',
+                      'EventLightningNetwork.py', 'Simulation.py', 'SimulationConfiguration.py']
+
+code_version: Optional[str] = None
+
+
+def get_code_version() -> str:
+    """
+    :return: A hash of the source code of the simulation modules.
+    """
+    global code_version
+    if code_version is None:
+        source_hash = hashlib.sha256()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for module in SIMULATION_MODULES:
+            with open(os.path.join(directory, module), 'rb') as module_file:
+                source_hash.update(module_file.read())
+        code_version = source_hash.hexdigest()
+    return code_version
+
+
+def get_result_key(network_configuration, transaction_samples_seed: int, repetition: int,
+                   **simulation_parameters) -> str:
+    """
+
+    :param network_configuration:
+    :param transaction_samples_seed:
+    :param repetition:
+    :param simulation_parameters: Other parameters the result depends on.
+    :return: A stable key of the result of simulating a repetition of the network configuration.
+    """
+    key = json.dumps({
+        'network_configuration': vars(network_configuration),
+        'transaction_samples_seed': transaction_samples_seed,
+        'repetition': repetition,
+        'simulation_parameters': simulation_parameters,
+        'code_version': get_code_version()
+    }, sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory: str):
+        """
+        Results of simulations persisted on disk, one file per key.
+        :param directory:
+        """
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key: str) -> str:
+        """
+
+        :param key:
+        :return:
+        """
+        return os.path.join(self.directory, key + '.pickle')
+
+    def load(self, key: str) -> Optional[Any]:
+        """
+
+        :param key:
+        :return: The result stored with the key, or None if there is none.
+        """
+        path = self.get_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as result_file:
+            return pickle.load(result_file)
+
+    def store(self, key: str, result: Any):
+        """
+        Store the result atomically, so an interrupted run never leaves a partial result behind.
+        :param key:
+        :param result:
+        :return:
+        """
+        temporary_path = self.get_path(key) + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary_path, 'wb') as result_file:
+            pickle.dump(result, result_file)
+        os.replace(temporary_path, self.get_path(key))
@@ -0,0 +1,267 @@
+from typing import List, Dict, Any, Tuple, Sequence
+import json
+import os
+import numpy as np
+
+METADATA_FILE_NAME: str = 'metadata.json'
+# The arrays of a store, each in its own .npy file, indexed by (r2r, r2c, fee, repetition) and then by their own axis.
+MEAN_BALANCES: str = 'mean_balances'
+FAIL_RATES: str = 'fail_rates'
+FAIL_HISTOGRAMS: str = 'fail_histograms'
+RELAYS_BALANCES: str = 'relays_balances'
+COMPLETED: str = 'completed'
+# Indexed by (r2r, r2c, fee) only.
+FINISHED: str = 'finished'
+ARRAY_NAMES: Tuple[str, ...] = (MEAN_BALANCES, FAIL_RATES, FAIL_HISTOGRAMS, RELAYS_BALANCES, COMPLETED, FINISHED)
+# Only in the stores of sweeps on the event engine, indexed by (r2r, r2c, fee, repetition, checkpoint, metric).
+EVENT_SERIES: str = 'event_series'
+# Only in the stores of sweeps which record path counters, indexed by (r2r, r2c, fee, repetition, counter).
+PATH_COUNTERS: str = 'path_counters'
+
+
+class ResultStore:
+    def __init__(self, directory: str, metadata: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        """
+        The results of all the repetitions of a sweep, as dense memory-mapped arrays indexed by (r2r, r2c, fee,
+        repetition), so slicing any of the axes only reads the slice. Use create_result_store or load_result_store.
+        :param directory:
+        :param metadata:
+        :param arrays:
+        """
+        self.directory: str = directory
+        self.metadata: Dict[str, Any] = metadata
+        self.r2r_balances: List[float] = metadata['r2r_balances']
+        self.r2c_balances: List[float] = metadata['r2c_balances']
+        self.transaction_proportional_fees: List[float] = metadata['transaction_proportional_fees']
+        self.repetitions_count: int = metadata['repetitions_count']
+        self.checkpoints: List[int] = metadata['checkpoints']
+        # The metrics of event_series, see EventLightningNetwork.get_event_metrics.
+        self.event_metrics: List[str] = metadata.get('event_metrics', list())
+        # The counters of path_counters, see LightningNetwork.get_path_counters.
+        self.path_counter_names: List[str] = metadata.get('path_counters', list())
+
+        # (r2r, r2c, fee, repetition, checkpoint)
+        self.mean_balances: np.ndarray = arrays[MEAN_BALANCES]
+        self.fail_rates: np.ndarray = arrays[FAIL_RATES]
+        # (r2r, r2c, fee, repetition, hop)
+        self.fail_histograms: np.ndarray = arrays[FAIL_HISTOGRAMS]
+        # (r2r, r2c, fee, repetition, relay)
+        self.relays_balances: np.ndarray = arrays[RELAYS_BALANCES]
+        # (r2r, r2c, fee, repetition)
+        self.completed: np.ndarray = arrays[COMPLETED]
+        # (r2r, r2c, fee), whether no more repetitions of the configuration will be stored.
+        self.finished: np.ndarray = arrays[FINISHED]
+        # (r2r, r2c, fee, repetition, checkpoint, metric), None if there are no event metrics.
+        self.event_series: np.ndarray = arrays.get(EVENT_SERIES)
+        # (r2r, r2c, fee, repetition, counter), None if there are no path counters.
+        self.path_counters: np.ndarray = arrays.get(PATH_COUNTERS)
+
+    def get_index(self, r2r_balance: float, r2c_balance: float, transaction_proportional_fee: float = None) -> tuple:
+        """
+
+        :param r2r_balance:
+        :param r2c_balance:
+        :param transaction_proportional_fee:
+        :return: The index of the configuration in the arrays, or of all the fees of the pair if
+         transaction_proportional_fee is None.
+        """
+        index = (self.r2r_balances.index(r2r_balance), self.r2c_balances.index(r2c_balance))
+        if transaction_proportional_fee is not None:
+            index += (self.transaction_proportional_fees.index(transaction_proportional_fee),)
+        return index
+
+    def store(self, r2r_balance: float, r2c_balance: float, transaction_proportional_fee: float, repetition: int,
+              mean_balances: List[float], fail_rates: List[float], fail_histogram: List[int],
+              relays_balances: List[float], event_series: List[List[float]] = None, path_counters: List[int] = None):
+        """
+
+        :param r2r_balance:
+        :param r2c_balance:
+        :param transaction_proportional_fee:
+        :param repetition:
+        :param mean_balances:
+        :param fail_rates:
+        :param fail_histogram:
+        :param relays_balances:
+        :param event_series: The event metrics at every checkpoint, if the store has them.
+        :param path_counters: The path counters of the repetition, if the store has them.
+        :return:
+        """
+        index = self.get_index(r2r_balance, r2c_balance, transaction_proportional_fee) + (repetition,)
+        self.mean_balances[index] = mean_balances
+        self.fail_rates[index] = fail_rates
+        self.fail_histograms[index] = fail_histogram
+        self.relays_balances[index] = relays_balances
+        if event_series is not None:
+            self.event_series[index] = event_series
+        if path_counters is not None:
+            self.path_counters[index] = path_counters
+        self.completed[index] = True
+
+    def finish(self, r2r_balance: float, r2c_balance: float, transaction_proportional_fee: float):
+        """
+        Mark that all the repetitions of the configuration are stored, which may be less than repetitions_count when the
+        number of repetitions is adaptive.
+        :param r2r_balance:
+        :param r2c_balance:
+        :param transaction_proportional_fee:
+        :return:
+        """
+        self.finished[self.get_index(r2r_balance, r2c_balance, transaction_proportional_fee)] = True
+
+    def is_completed(self, r2r_balance: float, r2c_balance: float) -> bool:
+        """
+
+        :param r2r_balance:
+        :param r2c_balance:
+        :return: Whether all the fees of the (r2r, r2c) pair are finished.
+        """
+        return bool(self.finished[self.get_index(r2r_balance, r2c_balance)].all())
+
+    def get_repetitions_counts(self, r2r_balance: float, r2c_balance: float,
+                               transaction_proportional_fee: float = None) -> np.ndarray:
+        """
+
+        :param r2r_balance:
+        :param r2c_balance:
+        :param transaction_proportional_fee:
+        :return: The number of stored repetitions of the configuration, or of every fee of the pair if
+         transaction_proportional_fee is None.
+        """
+        return self.completed[self.get_index(r2r_balance, r2c_balance, transaction_proportional_fee)].sum(axis=-1)
+
+    def get_mean_across_repetitions(self, array: np.ndarray, r2r_balance: float, r2c_balance: float) -> np.ndarray:
+        """
+
+        :param array: One of the arrays of the store, which are indexed by repetition.
+        :param r2r_balance:
+        :param r2c_balance:
+        :return: The mean of array across the stored repetitions of every fee of the (r2r, r2c) pair, indexed by (fee,
+         the axis of the array).
+        """
+        index = self.get_index(r2r_balance, r2c_balance)
+        completed = self.completed[index]
+        # Repetitions which weren't stored are zeros, and are left out of the sums.
+        sums = np.where(completed[:, :, np.newaxis], array[index], 0).sum(axis=1)
+        return sums / completed.sum(axis=1)[:, np.newaxis]
+
+    def get_standard_errors_across_repetitions(self, array: np.ndarray, r2r_balance: float, r2c_balance: float) \
+            -> np.ndarray:
+        """
+
+        :param array: One of the arrays of the store, which are indexed by repetition.
+        :param r2r_balance:
+        :param r2c_balance:
+        :return: The standard errors of the mean of array across the stored repetitions of every fee of the (r2r, r2c)
+         pair, indexed by (fee, the axis of the array), which are 0 for fees with less than two repetitions.
+        """
+        index = self.get_index(r2r_balance, r2c_balance)
+        completed = self.completed[index]
+        counts = completed.sum(axis=1)[:, np.newaxis]
+        means = self.get_mean_across_repetitions(array, r2r_balance, r2c_balance)
+        squared_deviations = np.where(completed[:, :, np.newaxis], (array[index] - means[:, np.newaxis]) ** 2, 0)
+        variances = squared_deviations.sum(axis=1) / np.maximum(counts - 1, 1)
+        return np.where(counts >= 2, np.sqrt(variances / counts), 0.)
+
+    def get_final_standard_errors(self, r2r_balance: float, r2c_balance: float, transaction_proportional_fee: float) \
+            -> Tuple[float, float]:
+        """
+
+        :param r2r_balance:
+        :param r2c_balance:
+        :param transaction_proportional_fee:
+        :return: The standard errors of the mean of the final mean balance and of the final fail rate across the stored
+         repetitions of the configuration, which are 0 for less than two repetitions.
+        """
+        index = self.get_index(r2r_balance, r2c_balance, transaction_proportional_fee)
+        completed = self.completed[index]
+        count = int(completed.sum())
+        if count < 2:
+            return 0., 0.
+        return tuple(float(np.std(array[index][completed, -1], ddof=1) / np.sqrt(count))
+                     for array in (self.mean_balances, self.fail_rates))
+
+    def flush(self):
+        """
+        Write the stored results to the files, so other processes mapping them see them.
+        :return:
+        """
+        for array in (self.mean_balances, self.fail_rates, self.fail_histograms, self.relays_balances, self.completed,
+                      self.finished):
+            array.flush()
+        for array in (self.event_series, self.path_counters):
+            if array is not None:
+                array.flush()
+
+
+def create_result_store(directory: str,
+                        r2r_balances: List[float],
+                        r2c_balances: List[float],
+                        transaction_proportional_fees: List[float],
+                        repetitions_count: int,
+                        checkpoints: List[int],
+                        fail_histogram_length: int,
+                        number_of_relays: int,
+                        parameters: Dict[str, Any] = None,
+                        event_metrics: Sequence[str] = None,
+                        path_counters: Sequence[str] = None) -> ResultStore:
+    """
+
+    :param directory:
+    :param r2r_balances:
+    :param r2c_balances:
+    :param transaction_proportional_fees:
+    :param repetitions_count:
+    :param checkpoints: The numbers of transactions after which the mean balances and fail rates are recorded.
+    :param fail_histogram_length:
+    :param number_of_relays:
+    :param parameters: Other parameters of the sweep to record in the metadata, which must be JSON serializable.
+    :param event_metrics: The metrics of the event series of the repetitions, or None if they have none.
+    :param path_counters: The path counters of the repetitions, or None if they aren't recorded.
+    :return: An empty store, whose files are created in directory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    metadata = {
+        'r2r_balances': list(r2r_balances),
+        'r2c_balances': list(r2c_balances),
+        'transaction_proportional_fees': list(transaction_proportional_fees),
+        'repetitions_count': repetitions_count,
+        'checkpoints': [int(checkpoint) for checkpoint in checkpoints],
+        'parameters': parameters if parameters is not None else dict(),
+        'event_metrics': list(event_metrics) if event_metrics is not None else list(),
+        'path_counters': list(path_counters) if path_counters is not None else list()
+    }
+    with open(os.path.join(directory, METADATA_FILE_NAME), 'w') as metadata_file:
+        json.dump(metadata, metadata_file, indent=4)
+
+    shape = (len(r2r_balances), len(r2c_balances), len(transaction_proportional_fees), repetitions_count)
+    arrays_shapes_and_types = {
+        MEAN_BALANCES: (shape + (len(checkpoints),), np.float64),
+        FAIL_RATES: (shape + (len(checkpoints),), np.float64),
+        FAIL_HISTOGRAMS: (shape + (fail_histogram_length,), np.int64),
+        RELAYS_BALANCES: (shape + (number_of_relays,), np.float64),
+        COMPLETED: (shape, np.bool_),
+        FINISHED: (shape[:-1], np.bool_)
+    }
+    if event_metrics is not None:
+        arrays_shapes_and_types[EVENT_SERIES] = (shape + (len(checkpoints), len(event_metrics)), np.float64)
+    if path_counters is not None:
+        arrays_shapes_and_types[PATH_COUNTERS] = (shape + (len(path_counters),), np.int64)
+    arrays = {name: np.lib.format.open_memmap(os.path.join(directory, name + '.npy'), mode='w+', dtype=dtype,
+                                              shape=array_shape)
+              for name, (array_shape, dtype) in arrays_shapes_and_types.items()}
+    return ResultStore(directory, metadata, arrays)
+
+
+def load_result_store(directory: str) -> ResultStore:
+    """
+
+    :param directory:
+    :return: Read-only store of the results in directory, whose arrays are memory-mapped.
+    """
+    with open(os.path.join(directory, METADATA_FILE_NAME)) as metadata_file:
+        metadata = json.load(metadata_file)
+    array_names = ARRAY_NAMES + ((EVENT_SERIES,) if metadata.get('event_metrics') else ()) + \
+        ((PATH_COUNTERS,) if metadata.get('path_counters') else ())
+    arrays = {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name in array_names}
+    return ResultStore(directory, metadata, arrays)
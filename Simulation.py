@@ -0,0 +1,350 @@
+from LightningNetwork import LightningNetworkConfiguration
+from LightningNetwork import LightningNetwork, NetworkSnapshot, create_lightning_network, EVENT_ENGINE
+from typing import Tuple, List, Dict, Optional, Any
+from TransactionSamples import load_transaction_samples
+from SimulationConfiguration import SimulationConfiguration
+from Recording import get_checkpoints
+from SimulationStats import SimulationStats, CONSTRUCTION
+import cProfile
+import hashlib
+import json
+import os
+import numpy as np
+
+# Parameters of a network configuration which don't change the topology and the initial balances of the network.
+FEE_PARAMETERS: Tuple[str, ...] = ('relay_transaction_fee', 'transaction_proportional_fee')
+
+# The network the process constructed last and its snapshot, by the key of its topology, see get_reusable_network.
+reusable_networks: Dict[str, Tuple[LightningNetwork, NetworkSnapshot]] = dict()
+
+# The entropy and spawn key of a numpy.random.SeedSequence, which recreate it.
+SeedRecord = Tuple[int, Tuple[int, ...]]
+# The configuration, the repetition index, and the mean balances, fail rates, fail histogram and relays balances of a
+# single repetition of the configuration, the seed of its random generator, its SimulationStats if they were collected,
+# the event metrics at every checkpoint if it ran on the event engine, and its path counters, see
+# LightningNetwork.get_path_counters.
+RepetitionResult = Tuple[SimulationConfiguration, int, List[float], List[float], List[int], List[float], SeedRecord,
+                         Optional[Dict[str, Any]], Optional[List[List[float]]], List[int]]
+
+
+def calc_simulation_results(
+        network_configuration: LightningNetworkConfiguration,
+        transaction_values: List[float],
+        checkpoints: List[int] = None,
+        random_generator: np.random.Generator = None,
+        simulation_stats: SimulationStats = None,
+        lightning_network: LightningNetwork = None,
+        event_series: List[List[float]] = None,
+        path_counters: List[int] = None
+) -> (List[float], List[float], List[int], List[float]):
+    """
+
+    :param network_configuration:
+    :param transaction_values:
+    :param checkpoints: The sorted numbers of transactions after which the mean balance and the fail rate are recorded,
+     see Recording.get_checkpoints. After every transaction if None.
+    :param random_generator: The generator of all the randomness of the simulation, unseeded if None.
+    :param simulation_stats: Stats to collect the counters and timers of the simulation into, if not None.
+    :param lightning_network: The network to simulate on, in its initial state, instead of constructing one, see
+     get_reusable_network. random_generator isn't used if it's given.
+    :param event_series: The EventLightningNetwork.get_event_metrics of the network at every checkpoint are appended to
+     it, if not None.
+    :param path_counters: The LightningNetwork.get_path_counters of the network after the last transaction are added to
+     it, if not None.
+    :return:
+    """
+    if lightning_network is None:
+        if simulation_stats is not None:
+            with simulation_stats.time(CONSTRUCTION):
+                lightning_network = create_lightning_network(network_configuration, random_generator)
+        else:
+            lightning_network = create_lightning_network(network_configuration, random_generator)
+    if simulation_stats is not None:
+        simulation_stats.instrument(lightning_network)
+    if checkpoints is None:
+        checkpoints = list(range(len(transaction_values) + 1))
+
+    mean_balances: List[float] = [0] * len(checkpoints)
+    fail_rates: List[float] = [0] * len(checkpoints)
+    # The checkpoint of the initial state is the first checkpoint, if there is one.
+    next_checkpoint_index = 0
+    if checkpoints[0] == 0:
+        mean_balances[0] = lightning_network.get_relays_mean_balance()
+        if event_series is not None:
+            event_series.append(lightning_network.get_event_metrics())
+        next_checkpoint_index = 1
+
+    num_fails = 0
+
+    batch_size: int = network_configuration.transaction_batch_size
+    if batch_size > 0:
+        checkpoints_array = np.asarray(checkpoints, dtype=np.int64)
+        for start in range(0, len(transaction_values), batch_size):
+            end = min(start + batch_size, len(transaction_values))
+            successes, batch_mean_balances = lightning_network.transact_batch(transaction_values[start:end])
+            fails = num_fails + np.cumsum(np.logical_not(successes))
+            num_fails = int(fails[-1])
+
+            # The checkpoints of the batch, as indices in the batch.
+            first, last = np.searchsorted(checkpoints_array, [start + 1, end + 1])
+            batch_checkpoints = checkpoints_array[first:last] - (start + 1)
+            fail_rates[first:last] = (fails[batch_checkpoints] / (batch_checkpoints + start + 1)).tolist()
+            mean_balances[first:last] = np.asarray(batch_mean_balances, dtype=np.float64)[batch_checkpoints].tolist()
+
+        if path_counters is not None:
+            path_counters.extend(lightning_network.get_path_counters())
+        return mean_balances, fail_rates, lightning_network.fail_histogram, lightning_network.get_relays_balances()
+
+    # A checkpoint past the last transaction, so the loop never runs out of checkpoints.
+    checkpoints = list(checkpoints) + [len(transaction_values) + 1]
+    next_checkpoint = checkpoints[next_checkpoint_index]
+
+    # Make index start with 1
+    for i, value in enumerate(transaction_values, 1):
+        c1, c2 = lightning_network.sample_client_pair()
+
+        if not lightning_network.transact(c1, c2, value):
+            num_fails += 1
+        if i == next_checkpoint:
+            fail_rates[next_checkpoint_index] = num_fails / i
+            mean_balances[next_checkpoint_index] = lightning_network.get_relays_mean_balance()
+            if event_series is not None:
+                event_series.append(lightning_network.get_event_metrics())
+            next_checkpoint_index += 1
+            next_checkpoint = checkpoints[next_checkpoint_index]
+
+    if path_counters is not None:
+        path_counters.extend(lightning_network.get_path_counters())
+    return mean_balances, fail_rates, lightning_network.fail_histogram, lightning_network.get_relays_balances()
+
+
+def create_network_configuration(r2c_balance,
+                                 r2r_balance,
+                                 transaction_proportional_fee,
+                                 channel_cost,
+                                 hops_number,
+                                 number_of_relays,
+                                 number_of_clients,
+                                 number_of_relays_per_client,
+                                 engine,
+                                 transaction_batch_size,
+                                 is_construction_lazy,
+                                 topology,
+                                 relay_degree,
+                                 topology_path,
+                                 is_path_capacity_aware,
+                                 max_payment_attempts,
+                                 arrival_process,
+                                 arrival_rate,
+                                 mean_hold_time) -> LightningNetworkConfiguration:
+    """
+
+    :param r2c_balance:
+    :param r2r_balance:
+    :param transaction_proportional_fee:
+    :param channel_cost:
+    :param hops_number:
+    :param number_of_relays:
+    :param number_of_clients:
+    :param number_of_relays_per_client:
+    :param engine:
+    :param transaction_batch_size:
+    :param is_construction_lazy:
+    :param topology:
+    :param relay_degree:
+    :param topology_path:
+    :param is_path_capacity_aware:
+    :param max_payment_attempts:
+    :param arrival_process:
+    :param arrival_rate:
+    :param mean_hold_time:
+    :return:
+    """
+    return LightningNetworkConfiguration(
+        default_balance_client_relay_channel_client=float('inf'),
+        default_balance_client_relay_channel_relay=r2c_balance,
+        default_balance_relay_relay_channel=r2r_balance,
+        channel_cost=channel_cost,
+        relay_transaction_fee=0,
+        transaction_proportional_fee=transaction_proportional_fee,
+        hops_number=hops_number,
+        is_liquidity_assumed=False,
+        add_fees_to_value=False,
+        number_of_relays=number_of_relays,
+        number_of_clients=number_of_clients,
+        number_of_relays_per_client=number_of_relays_per_client,
+        engine=engine,
+        transaction_batch_size=transaction_batch_size,
+        is_construction_lazy=is_construction_lazy,
+        topology=topology,
+        relay_degree=relay_degree,
+        topology_path=topology_path,
+        is_path_capacity_aware=is_path_capacity_aware,
+        max_payment_attempts=max_payment_attempts,
+        arrival_process=arrival_process,
+        arrival_rate=arrival_rate,
+        mean_hold_time=mean_hold_time
+    )
+
+
+def get_simulation_seed_sequence(network_configuration: LightningNetworkConfiguration, simulation_seed: int,
+                                 repetition: int) -> np.random.SeedSequence:
+    """
+    The seed of a (configuration, repetition) task is a child of the simulation seed keyed by a hash of the network
+    configuration and the repetition, so it doesn't depend on which worker runs the task or when.
+    :param network_configuration:
+    :param simulation_seed: Unseeded if None.
+    :param repetition:
+    :return:
+    """
+    configuration_hash = hashlib.sha256(json.dumps(vars(network_configuration), sort_keys=True).encode('utf-8'))
+    configuration_key: int = int.from_bytes(configuration_hash.digest()[:8], 'little')
+    return np.random.SeedSequence(simulation_seed, spawn_key=(configuration_key, repetition))
+
+
+def get_reusable_network(network_configuration: LightningNetworkConfiguration, simulation_seed: int,
+                         random_generator: np.random.Generator) -> LightningNetwork:
+    """
+    A network of the configuration in its initial state, which is only constructed once in the process for all the
+    repetitions and fees which share its topology and its initial balances, and restored from its snapshot for every
+    other one. Since the tasks of a topology run one after the other, only the last topology is kept. Its topology is
+    drawn from a seed of its own, so it's the same whichever process constructs it.
+    :param network_configuration:
+    :param simulation_seed: See get_simulation_seed_sequence.
+    :param random_generator: The generator of the randomness of the simulation on the network.
+    :return:
+    """
+    topology = {name: value for name, value in vars(network_configuration).items() if name not in FEE_PARAMETERS}
+    topology_hash = hashlib.sha256(json.dumps(topology, sort_keys=True).encode('utf-8'))
+    topology_key: str = topology_hash.hexdigest()
+
+    if topology_key not in reusable_networks:
+        reusable_networks.clear()
+        seed_sequence = np.random.SeedSequence(simulation_seed,
+                                               spawn_key=(int.from_bytes(topology_hash.digest()[:8], 'little'),))
+        lightning_network: LightningNetwork = create_lightning_network(network_configuration,
+                                                                       np.random.default_rng(seed_sequence))
+        reusable_networks[topology_key] = (lightning_network, lightning_network.snapshot())
+
+    lightning_network, snapshot = reusable_networks[topology_key]
+    lightning_network.restore(snapshot, random_generator)
+    lightning_network.configuration = network_configuration
+    return lightning_network
+
+
+class SimulationTask:
+    def __init__(self,
+                 network_configuration: LightningNetworkConfiguration,
+                 transaction_samples_path: str,
+                 repetition: int,
+                 recording_policy: str,
+                 recording_resolution: int,
+                 simulation_seed: int,
+                 collect_simulation_stats: bool = False,
+                 profile_directory: str = None,
+                 reuse_networks: bool = False):
+        """
+        A single repetition of a configuration, which a worker runs with run_simulation_task. Its fields are the
+        parameters of run_simulation_repetition.
+        :param network_configuration:
+        :param transaction_samples_path: See run_simulation_repetition.
+        :param repetition:
+        :param recording_policy: See run_simulation_repetition.
+        :param recording_resolution: See run_simulation_repetition.
+        :param simulation_seed: See run_simulation_repetition.
+        :param collect_simulation_stats: See run_simulation_repetition.
+        :param profile_directory: See run_simulation_repetition.
+        :param reuse_networks: See run_simulation_repetition.
+        """
+        self.network_configuration: LightningNetworkConfiguration = network_configuration
+        self.transaction_samples_path: str = transaction_samples_path
+        self.repetition: int = repetition
+        self.recording_policy: str = recording_policy
+        self.recording_resolution: int = recording_resolution
+        self.simulation_seed: int = simulation_seed
+        self.collect_simulation_stats: bool = collect_simulation_stats
+        self.profile_directory: str = profile_directory
+        self.reuse_networks: bool = reuse_networks
+
+
+def run_simulation_task(task: SimulationTask) -> Tuple[SimulationTask, RepetitionResult]:
+    """
+    Run a task, for Pool.imap_unordered.
+    :param task:
+    :return: The task and its result.
+    """
+    return task, run_simulation_repetition(**vars(task))
+
+
+def run_simulation_repetition(network_configuration: LightningNetworkConfiguration,
+                              transaction_samples_path: str,
+                              repetition: int,
+                              recording_policy: str,
+                              recording_resolution: int,
+                              simulation_seed: int,
+                              collect_simulation_stats: bool = False,
+                              profile_directory: str = None,
+                              reuse_networks: bool = False) -> RepetitionResult:
+    """
+    Run a single repetition of a configuration, on the transaction sample of the repetition.
+    :param network_configuration: See create_network_configuration.
+    :param transaction_samples_path: Path of the .npy file of the transaction samples, see TransactionSamples.
+    :param repetition:
+    :param recording_policy: See Recording.get_checkpoints.
+    :param recording_resolution: See Recording.get_checkpoints.
+    :param simulation_seed: See get_simulation_seed_sequence.
+    :param collect_simulation_stats: Whether to collect the SimulationStats of the simulation.
+    :param profile_directory: The folder to dump a cProfile profile of the simulation into, if not None.
+    :param reuse_networks: Whether to reuse the network of the process, see get_reusable_network.
+    :return:
+    """
+    r2r_balance: float = network_configuration.default_balance_relay_relay_channel
+    r2c_balance: float = network_configuration.default_balance_client_relay_channel_relay
+    transaction_proportional_fee: float = network_configuration.transaction_proportional_fee
+    seed_sequence: np.random.SeedSequence = get_simulation_seed_sequence(network_configuration, simulation_seed,
+                                                                         repetition)
+    transaction_values: np.ndarray = load_transaction_samples(transaction_samples_path)[repetition]
+    simulation_stats: SimulationStats = SimulationStats(network_configuration.hops_number + 3) \
+        if collect_simulation_stats else None
+    profile: cProfile.Profile = cProfile.Profile() if profile_directory is not None else None
+    event_series: List[List[float]] = list() if network_configuration.engine == EVENT_ENGINE else None
+    path_counters: List[int] = list()
+
+    if profile is not None:
+        profile.enable()
+    random_generator: np.random.Generator = np.random.default_rng(seed_sequence)
+    lightning_network: LightningNetwork = None
+    if reuse_networks:
+        if simulation_stats is not None:
+            with simulation_stats.time(CONSTRUCTION):
+                lightning_network = get_reusable_network(network_configuration, simulation_seed, random_generator)
+        else:
+            lightning_network = get_reusable_network(network_configuration, simulation_seed, random_generator)
+    mean_balances, fail_rates, fail_histogram, relays_balances = calc_simulation_results(
+        network_configuration=network_configuration,
+        transaction_values=transaction_values,
+        checkpoints=get_checkpoints(len(transaction_values), recording_policy, recording_resolution),
+        random_generator=random_generator,
+        simulation_stats=simulation_stats,
+        lightning_network=lightning_network,
+        event_series=event_series,
+        path_counters=path_counters
+    )
+    if lightning_network is not None:
+        # The network is restored for the next task, which resets its fail histogram.
+        fail_histogram = list(fail_histogram)
+        if simulation_stats is not None:
+            SimulationStats.uninstrument(lightning_network)
+    if profile is not None:
+        profile.disable()
+        os.makedirs(profile_directory, exist_ok=True)
+        profile_name = "r2r {:.0E} r2c {:.0E} fee {} repetition {} pid {}.prof".format(
+            r2r_balance, r2c_balance, transaction_proportional_fee, repetition, os.getpid())
+        profile.dump_stats(os.path.join(profile_directory, profile_name))
+
+    configuration: SimulationConfiguration = SimulationConfiguration(r2r_balance, r2c_balance, 0,
+                                                                     transaction_proportional_fee)
+
+    return configuration, repetition, mean_balances, fail_rates, fail_histogram, relays_balances, \
+        (seed_sequence.entropy, tuple(seed_sequence.spawn_key)), \
+        simulation_stats.to_dict() if simulation_stats is not None else None, event_series, path_counters
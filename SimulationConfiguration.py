@@ -0,0 +1,21 @@
+class SimulationConfiguration:
+    def __init__(self, r2r_balance, r2c_balance, base_fee, proportional_fee):
+        self.r2r_balance = r2r_balance
+        self.r2c_balance = r2c_balance
+        self.base_fee = base_fee
+        self.proportional_fee = proportional_fee
+
+    def __hash__(self):
+        return hash((self.r2c_balance, self.r2c_balance, self.base_fee, self.proportional_fee))
+
+    def __eq__(self, other):
+        return (self.r2r_balance, self.r2c_balance, self.base_fee, self.proportional_fee) \
+               == (other.r2r_balance, other.r2c_balance, other.base_fee, other.proportional_fee)
+
+    def __ne__(self, other):
+        # Not strictly necessary, but to avoid having both x==y and x!=y
+        # True at the same time
+        return not (self == other)
+
+    def __str__(self):
+        return "{}%".format(self.proportional_fee * 100)
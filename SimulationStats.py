@@ -0,0 +1,139 @@
+from typing import List, Dict, Callable, Any, Tuple
+from collections import defaultdict
+from contextlib import contextmanager
+import time
+
+CONSTRUCTION: str = 'construction'
+PATH_SELECTION: str = 'path_selection'
+PATH_VERIFICATION: str = 'path_verification'
+TRANSACTIONS: str = 'transactions'
+BALANCE_UPDATES: str = 'balance_updates'
+METRIC_RECORDING: str = 'metric_recording'
+# The methods instrument replaces on a network.
+INSTRUMENTED_METHODS: Tuple[str, ...] = ('find_path', 'verify_path_hops', 'transfer_along_path', 'transact',
+                                         'get_relays_mean_balance', 'transact_batch', 'sample_paths', 'verify_paths',
+                                         'apply_paths', 'update_ledger', 'find_retry_path', 'get_failed_hop',
+                                         'transact_with_retries')
+
+
+class SimulationStats:
+    def __init__(self, path_length: int):
+        """
+        Counters and timers of the phases of a simulation. A network only pays for them once instrument is called on
+        it, since instrumenting replaces its methods by timed ones, and the methods of other networks are untouched.
+        :param path_length: The number of channels in a path, which are the first buckets of the fail histogram.
+        """
+        self.timers: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+        # The number of verified paths which reached each hop, and the number of them which failed there.
+        self.hop_checks: List[int] = [0] * path_length
+        self.hop_failures: List[int] = [0] * path_length
+
+    @contextmanager
+    def time(self, phase: str):
+        """
+        Add the time the block takes to the timer of the phase.
+        :param phase:
+        :return:
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[phase] += time.perf_counter() - start
+
+    def timed(self, phase: str, function: Callable) -> Callable:
+        """
+
+        :param phase:
+        :param function:
+        :return: function, which adds the time of every call to the timer of the phase, and counts the calls.
+        """
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.timers[phase] += time.perf_counter() - start
+                self.counters[phase + '_calls'] += 1
+        return timed_function
+
+    def counted_verification(self, fail_histogram: List[int], function: Callable[..., Any],
+                             get_paths_count: Callable[..., int]) -> Callable:
+        """
+
+        :param fail_histogram: The fail histogram function adds the failures of the paths it verifies to.
+        :param function: A path verification function.
+        :param get_paths_count: The number of paths function verifies, given its arguments.
+        :return: function, which counts the verified paths which reach and fail at each hop.
+        """
+        def counted_function(*args, **kwargs):
+            # Only the buckets of the hops, since the failures of verified paths are never in the unroutable bucket.
+            fail_histogram_before = fail_histogram[:len(self.hop_checks)]
+            result = function(*args, **kwargs)
+            paths_count = get_paths_count(*args, **kwargs)
+            for hop, (fails, fails_before) in enumerate(zip(fail_histogram, fail_histogram_before)):
+                self.hop_checks[hop] += paths_count
+                self.hop_failures[hop] += fails - fails_before
+                paths_count -= fails - fails_before
+            return result
+        return counted_function
+
+    def instrument(self, lightning_network):
+        """
+        Time the phases of the transactions of the network, and count the failures at each hop.
+        :param lightning_network:
+        :return:
+        """
+        lightning_network.simulation_stats = self
+        lightning_network.find_path = self.timed(PATH_SELECTION, lightning_network.find_path)
+        verify_path_hops = self.counted_verification(lightning_network.fail_histogram,
+                                                     lightning_network.verify_path_hops, lambda path, hop_values: 1)
+        if hasattr(lightning_network, 'get_failed_hop'):
+            # ArrayLightningNetwork checks the hops of its paths in get_failed_hop, which its retries call too.
+            lightning_network.get_failed_hop = self.timed(PATH_VERIFICATION, lightning_network.get_failed_hop)
+            lightning_network.verify_path_hops = verify_path_hops
+        else:
+            lightning_network.verify_path_hops = self.timed(PATH_VERIFICATION, verify_path_hops)
+        lightning_network.transfer_along_path = self.timed(BALANCE_UPDATES, lightning_network.transfer_along_path)
+        lightning_network.transact = self.timed(TRANSACTIONS, lightning_network.transact)
+        lightning_network.get_relays_mean_balance = self.timed(METRIC_RECORDING,
+                                                               lightning_network.get_relays_mean_balance)
+        if hasattr(lightning_network, 'sample_paths'):
+            # The batch phases of ArrayLightningNetwork, whose transact_batch doesn't call transact.
+            lightning_network.transact_batch = self.timed(TRANSACTIONS, lightning_network.transact_batch)
+            lightning_network.sample_paths = self.timed(PATH_SELECTION, lightning_network.sample_paths)
+            lightning_network.verify_paths = self.timed(PATH_VERIFICATION, self.counted_verification(
+                lightning_network.fail_histogram, lightning_network.verify_paths,
+                lambda paths, hop_values, transactions: len(transactions)))
+            lightning_network.apply_paths = self.timed(BALANCE_UPDATES, lightning_network.apply_paths)
+            lightning_network.update_ledger = self.timed(BALANCE_UPDATES, lightning_network.update_ledger)
+            lightning_network.find_retry_path = self.timed(PATH_SELECTION, lightning_network.find_retry_path)
+            # A transaction with retries only counts the failure of its last path, as a single verified path.
+            lightning_network.transact_with_retries = self.counted_verification(
+                lightning_network.fail_histogram, lightning_network.transact_with_retries,
+                lambda source_client, target_client, value: 1)
+
+    @staticmethod
+    def uninstrument(lightning_network):
+        """
+        Restore the methods instrument replaced, so a network which is reused isn't timed twice.
+        :param lightning_network:
+        :return:
+        """
+        lightning_network.simulation_stats = None
+        for method_name in INSTRUMENTED_METHODS:
+            vars(lightning_network).pop(method_name, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: The stats, where the timer of the transactions is their whole time, including their phases.
+        """
+        return {
+            'timers': dict(self.timers),
+            'counters': dict(self.counters),
+            'hop_checks': list(self.hop_checks),
+            'hop_failures': list(self.hop_failures),
+            'hop_failure_rates': [fails / checks if checks > 0 else 0.
+                                  for fails, checks in zip(self.hop_failures, self.hop_checks)]
+        }
@@ -0,0 +1,302 @@
+from typing import List, Tuple, Sequence, Dict, Optional, Set
+from LightningNetwork import LightningNetwork, UNROUTABLE, ABANDONED_SEARCHES
+from ArrayLightningNetwork import ArrayLightningNetwork
+from Topology import create_topology, get_reverse_edges
+import numpy as np
+import sys
+
+# A path in the sparse engine: (source client channel, relays in the path, target client channel, the edge of every
+# relay-relay hop).
+SparsePath = Tuple[int, List[int], int, List[int]]
+# The number of hops the path search steps through before it gives up on a transaction, which bounds its time on large
+# dense topologies where most of the relays are dead ends.
+PATH_SEARCH_STEPS_LIMIT: int = 10000
+
+
+class SparseLightningNetwork(ArrayLightningNetwork):
+    """
+    Lightning Network whose relays have channels along a sparse topology, see Topology.
+
+    The channels between the relays are the edges of a CSR adjacency: the neighbors of relay i are
+    indices[indptr[i]:indptr[i + 1]], and the balance relay i holds in the channel of edge k is edge_balances[k], where
+    reverse_edges[k] is the edge of the other direction of the channel. Clients and their channels are as in
+    ArrayLightningNetwork.
+
+    A path has exactly HOPS_NUMBER middle relays, as in the full mesh. It's drawn by a randomized DFS from the bootstrap
+    relay of the source client, which only steps to relays from which the bootstrap relay of the target client is
+    still reachable within the remaining hops, as found by a BFS from it, and backtracks from relays whose neighbors
+    are all in the path already, so a transaction is only unroutable when there's no path.
+    """
+    def create_relays(self) -> range:
+        """
+        :return: Relays with channels along the topology of the configuration.
+        """
+        number_of_relays: int = self.configuration.number_of_relays
+        channel_balance: float = self.configuration.default_balance_relay_relay_channel
+        client_channels_count: int = \
+            self.configuration.number_of_clients * self.configuration.number_of_relays_per_client
+
+        self.indptr, self.indices = create_topology(self.configuration.topology, number_of_relays,
+                                                    self.configuration.relay_degree, self.random_generator,
+                                                    self.configuration.topology_path)
+        self.reverse_edges: np.ndarray = get_reverse_edges(self.indptr, self.indices)
+        edges_count: int = len(self.indices)
+
+        self.channel_balances: np.ndarray = np.empty(edges_count + 2 * client_channels_count, dtype=np.float64)
+        self.edge_balances: np.ndarray = self.channel_balances[:edges_count]
+        self.edge_balances.fill(channel_balance)
+
+        # The relay with the larger index creates the channel and pays its channel cost, as in the full mesh.
+        sources = np.repeat(np.arange(number_of_relays, dtype=np.int64), np.diff(self.indptr))
+        created_channels = np.bincount(sources[sources > self.indices], minlength=number_of_relays)
+        self.relays_balance: np.ndarray = -(created_channels * self.configuration.channel_cost
+                                            + np.diff(self.indptr) * channel_balance).astype(np.float64)
+
+        # The distance of every relay from the target relay of the path being found, up to HOPS_NUMBER, and
+        # HOPS_NUMBER + 1 for farther relays.
+        self.relay_distances: np.ndarray = np.full(number_of_relays, self.configuration.hops_number + 1,
+                                                   dtype=np.int64)
+        return range(number_of_relays)
+
+    def calc_construction_price(self) -> float:
+        """
+
+        :return:
+        """
+        return len(self.indices) // 2 * self.configuration.channel_cost
+
+    def transact(self, source_client: int, target_client: int, value: float) -> bool:
+        """
+
+        :param source_client:
+        :param target_client:
+        :param value:
+        :return:
+        """
+        if self.configuration.add_fees_to_value:
+            value = self.calculate_value_with_cumulative_fees(value)
+        if value < 0:
+            raise ValueError("Tried to send negative value: ", value)
+
+        hop_values, hop_fees = self.calculate_hop_schedule(value)
+        path: Optional[SparsePath] = self.find_path(source_client, target_client, hop_values)
+        if path is None:
+            # Fails without reaching a channel, in the last bucket of the fail histogram.
+            self.path_counters[UNROUTABLE] += 1
+            self.fail_histogram[-1] += 1
+            return False
+        if self.verify_path_hops(path, hop_values) is None:
+            return False
+        self.transfer_along_path(path, hop_values, hop_fees)
+        return True
+
+    def transact_batch(self, transaction_values: Sequence[float]) -> Tuple[Sequence[bool], Sequence[float]]:
+        """
+        Paths depend on the balances when they're capacity aware, and have no fixed layout, so the transactions are
+        performed one after the other.
+        :param transaction_values:
+        :return: See LightningNetwork.transact_batch.
+        """
+        return LightningNetwork.transact_batch(self, transaction_values)
+
+    def find_path(self, source_client: int, target_client: int, hop_values: List[float] = None) \
+            -> Optional[SparsePath]:
+        """
+
+        :param source_client:
+        :param target_client:
+        :param hop_values: See calculate_hop_schedule. The path selection is only capacity aware when they're given.
+        :return: The path, or None if there is none, or if the search reached PATH_SEARCH_STEPS_LIMIT.
+        """
+        relays_per_client: int = self.configuration.number_of_relays_per_client
+        hops_number: int = self.configuration.hops_number
+        is_capacity_aware: bool = self.configuration.is_path_capacity_aware and hop_values is not None and \
+            not self.configuration.is_liquidity_assumed
+        source_channel: int = source_client * relays_per_client + self.random_stream.randrange(relays_per_client)
+        target_channel: int = target_client * relays_per_client + self.random_stream.randrange(relays_per_client)
+        first_relay = int(self.client_channel_relays[source_channel])
+        target_relay = int(self.client_channel_relays[target_channel])
+
+        reached_relays = self.calculate_relay_distances(target_relay)
+        try:
+            relays: List[int] = [first_relay]
+            edges: List[int] = list()
+            visited_relays = {first_relay, target_relay}
+            # The edges of every hop of the path so far which weren't tried yet, the last of them from the last relay.
+            untried_edges: List[List[int]] = [
+                self.get_allowed_edges(first_relay, 0, target_relay, visited_relays, hop_values, is_capacity_aware)]
+            for _ in range(PATH_SEARCH_STEPS_LIMIT):
+                candidates = untried_edges[-1]
+                if not candidates:
+                    # A dead end, so step back to the previous relay and try its other edges.
+                    untried_edges.pop()
+                    if not edges:
+                        return None
+                    edges.pop()
+                    visited_relays.discard(relays.pop())
+                    continue
+
+                # The next edge is drawn among the untried ones, so the first path tried is a random walk's.
+                k: int = self.random_stream.randrange(len(candidates))
+                candidates[k], candidates[-1] = candidates[-1], candidates[k]
+                edge: int = candidates.pop()
+                current_relay = int(self.indices[edge])
+                relays.append(current_relay)
+                edges.append(edge)
+                if len(edges) == hops_number + 1:
+                    return source_channel, relays, target_channel, edges
+                visited_relays.add(current_relay)
+                untried_edges.append(self.get_allowed_edges(current_relay, len(edges), target_relay, visited_relays,
+                                                            hop_values, is_capacity_aware))
+            self.path_counters[ABANDONED_SEARCHES] += 1
+            return None
+        finally:
+            self.relay_distances[reached_relays] = hops_number + 1
+
+    def get_allowed_edges(self, relay: int, hop: int, target_relay: int, visited_relays: Set[int],
+                          hop_values: Optional[List[float]], is_capacity_aware: bool) -> List[int]:
+        """
+
+        :param relay: The last relay of the path so far.
+        :param hop: The index of the hop from relay, where hop 0 is the hop from the first relay.
+        :param target_relay:
+        :param visited_relays: The relays in the path so far, and the target relay.
+        :param hop_values: See calculate_hop_schedule.
+        :param is_capacity_aware: Whether only edges whose sender has the value of the hop are allowed.
+        :return: The edges from relay to relays which aren't in the path, and from which the target relay is reachable
+         in the hops left after this one, or the edge to the target relay for the last hop.
+        """
+        hops_number: int = self.configuration.hops_number
+        start, end = int(self.indptr[relay]), int(self.indptr[relay + 1])
+        neighbors = self.indices[start:end]
+        if hop < hops_number:
+            is_allowed = self.relay_distances[neighbors] <= hops_number - hop
+        else:
+            is_allowed = neighbors == target_relay
+        if is_capacity_aware:
+            is_allowed &= self.edge_balances[start:end] >= hop_values[hop + 1]
+        return [start + k for k in np.flatnonzero(is_allowed).tolist()
+                if int(neighbors[k]) not in visited_relays or hop == hops_number]
+
+    def calculate_relay_distances(self, target_relay: int) -> np.ndarray:
+        """
+        Set the distances of the relays up to HOPS_NUMBER hops from target_relay in relay_distances, with a BFS whose
+        levels are expanded with vectorized operations.
+        :param target_relay:
+        :return: The relays whose distance was set, which the caller should reset to HOPS_NUMBER + 1.
+        """
+        indptr, indices = self.indptr, self.indices
+        relay_distances = self.relay_distances
+        frontier = np.array([target_relay], dtype=np.int64)
+        relay_distances[frontier] = 0
+        reached_relays = [frontier]
+        for distance in range(1, self.configuration.hops_number + 1):
+            starts, lengths = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+            # The positions of the edges of all the frontier relays in indices.
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            neighbors = indices[positions]
+            frontier = np.unique(neighbors[relay_distances[neighbors] > distance])
+            if len(frontier) == 0:
+                break
+            relay_distances[frontier] = distance
+            reached_relays.append(frontier)
+        return np.concatenate(reached_relays)
+
+    def verify_path_hops(self, path: SparsePath, hop_values: List[float]) -> Optional[SparsePath]:
+        """
+        Check that the sender of every hop has the value of the hop in its channel, and count a failure in
+        fail_histogram at the first hop which doesn't.
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :return: The path, or None if a hop failed or there is no path.
+        """
+        if path is None:
+            return None
+        return super().verify_path_hops(path, hop_values)
+
+    def get_failed_hop(self, path: SparsePath, hop_values: List[float]) -> Optional[int]:
+        """
+
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :return: See ArrayLightningNetwork.get_failed_hop.
+        """
+        if self.configuration.is_liquidity_assumed:
+            return None
+
+        source_channel, relays, target_channel, edges = path
+        if hop_values[0] > self.client_channel_balances[source_channel]:
+            return 0
+
+        edge_balances = self.edge_balances
+        for i, edge in enumerate(edges):
+            if hop_values[i + 1] > edge_balances[edge]:
+                return i + 1
+
+        if hop_values[len(relays)] > self.relay_client_channel_balances[target_channel]:
+            return len(relays)
+
+        return None
+
+    def transfer_along_path(self, path: SparsePath, hop_values: List[float], hop_fees: List[float]):
+        """
+        Transfer the value of every hop in its channel, from its sender to its receiver, and collect the fees.
+        :param path:
+        :param hop_values: See calculate_hop_schedule.
+        :param hop_fees: See calculate_hop_schedule.
+        :return:
+        """
+        source_channel, relays, target_channel, edges = path
+        edge_balances = self.edge_balances
+        reverse_edges = self.reverse_edges
+        ledger = self.relays_balance_ledger
+        sum_relays_balances: float = self.sum_relays_balances
+
+        value = hop_values[0]
+        self.client_channel_balances[source_channel] -= value
+        self.relay_client_channel_balances[source_channel] += value
+        ledger.add(relays[0], value)
+        sum_relays_balances += hop_fees[0]
+
+        for i, edge in enumerate(edges):
+            value = hop_values[i + 1]
+            edge_balances[edge] -= value
+            edge_balances[reverse_edges[edge]] += value
+            ledger.add(relays[i], -value)
+            ledger.add(relays[i + 1], value)
+            sum_relays_balances += hop_fees[i + 1]
+
+        value = hop_values[len(relays)]
+        self.relay_client_channel_balances[target_channel] -= value
+        self.client_channel_balances[target_channel] += value
+        ledger.add(relays[-1], -value)
+        sum_relays_balances += hop_fees[len(relays)]
+
+        # The fees of the last hop shouldn't be collected.
+        self.sum_relays_balances = sum_relays_balances - hop_fees[len(relays)]
+
+    def get_memory_report(self) -> Dict[str, float]:
+        """
+        :return: The memory footprint of the network: the number of nodes and channels, the average bytes per node and
+         per channel, and the total bytes of the network.
+        """
+        number_of_relays: int = len(self.relays)
+        nodes_bytes: int = self.relays_balance.nbytes + self.clients_balance.nbytes + self.indptr.nbytes + \
+            self.relay_distances.nbytes + self.relays_balance_ledger.get_balances().nbytes
+        channels_bytes: int = self.channel_balances.nbytes + self.indices.nbytes + self.reverse_edges.nbytes + \
+            self.client_channel_relays.nbytes
+        return self.create_memory_report(number_of_relays + len(self.clients), nodes_bytes,
+                                         len(self.indices) // 2 + len(self.client_channel_relays), channels_bytes,
+                                         sys.getsizeof(self.fail_histogram))
+
+    def calculate_relays_balances(self) -> List[float]:
+        """
+
+        :return:
+        """
+        sources = np.repeat(np.arange(len(self.relays), dtype=np.int64), np.diff(self.indptr))
+        relays_balances = self.relays_balance + np.bincount(sources, weights=self.edge_balances,
+                                                            minlength=len(self.relays)) + \
+            np.bincount(self.client_channel_relays, weights=self.relay_client_channel_balances,
+                        minlength=len(self.relays))
+        return relays_balances.tolist()
@@ -0,0 +1,125 @@
+from typing import Tuple
+from RandomStream import RandomStream
+import numpy as np
+
+FULL_TOPOLOGY: str = 'full'
+RANDOM_REGULAR_TOPOLOGY: str = 'random_regular'
+SCALE_FREE_TOPOLOGY: str = 'scale_free'
+EDGE_LIST_TOPOLOGY: str = 'edge_list'
+TOPOLOGIES: Tuple[str, ...] = (FULL_TOPOLOGY, RANDOM_REGULAR_TOPOLOGY, SCALE_FREE_TOPOLOGY, EDGE_LIST_TOPOLOGY)
+
+# A CSR adjacency of the relays: the neighbors of relay i are indices[indptr[i]:indptr[i + 1]], sorted.
+Adjacency = Tuple[np.ndarray, np.ndarray]
+
+
+def create_topology(topology: str, number_of_relays: int, relay_degree: int, random_generator: np.random.Generator,
+                    topology_path: str = None) -> Adjacency:
+    """
+
+    :param topology: One of TOPOLOGIES.
+    :param number_of_relays:
+    :param relay_degree: The degree of every relay in a random regular topology, and the mean degree of the relays in a
+     scale-free topology.
+    :param random_generator:
+    :param topology_path: The edge list file of an edge list topology, see load_edges.
+    :return: The adjacency of the channels between the relays.
+    """
+    if topology == FULL_TOPOLOGY:
+        edges = np.column_stack(np.triu_indices(number_of_relays, 1))
+    elif topology == RANDOM_REGULAR_TOPOLOGY:
+        edges = create_random_regular_edges(number_of_relays, relay_degree, random_generator)
+    elif topology == SCALE_FREE_TOPOLOGY:
+        edges = create_scale_free_edges(number_of_relays, relay_degree, random_generator)
+    elif topology == EDGE_LIST_TOPOLOGY:
+        edges = load_edges(topology_path, number_of_relays)
+    else:
+        raise ValueError("Unknown topology: ", topology)
+    return create_adjacency(number_of_relays, edges)
+
+
+def create_random_regular_edges(number_of_relays: int, relay_degree: int, random_generator: np.random.Generator) \
+        -> np.ndarray:
+    """
+    Pair the relay_degree stubs of every relay at random, and drop the loops and the parallel edges, which leaves almost
+    every relay with relay_degree channels when relay_degree is much smaller than number_of_relays.
+    :param number_of_relays:
+    :param relay_degree:
+    :param random_generator:
+    :return:
+    """
+    stubs = np.repeat(np.arange(number_of_relays, dtype=np.int64), relay_degree)
+    random_generator.shuffle(stubs)
+    edges = stubs[:len(stubs) - len(stubs) % 2].reshape(-1, 2)
+    return edges[edges[:, 0] != edges[:, 1]]
+
+
+def create_scale_free_edges(number_of_relays: int, relay_degree: int, random_generator: np.random.Generator) \
+        -> np.ndarray:
+    """
+    Barabási-Albert preferential attachment: every relay opens channels with relay_degree / 2 distinct relays created
+    before it, each drawn with probability proportional to its degree.
+    :param number_of_relays:
+    :param relay_degree:
+    :param random_generator:
+    :return:
+    """
+    channels_per_relay: int = max(1, relay_degree // 2)
+    initial_relays: int = min(channels_per_relay + 1, number_of_relays)
+    random_stream: RandomStream = RandomStream(random_generator)
+
+    # The initial relays are a full mesh.
+    edges = [(i, j) for i in range(initial_relays) for j in range(i)]
+    # Every relay appears once for every channel it has, so a uniform draw from it is proportional to the degrees.
+    endpoints = [relay for edge in edges for relay in edge]
+    for relay in range(initial_relays, number_of_relays):
+        other_relays = set()
+        while len(other_relays) < channels_per_relay:
+            other_relays.add(endpoints[random_stream.randrange(len(endpoints))])
+        for other_relay in sorted(other_relays):
+            edges.append((relay, other_relay))
+            endpoints.extend((relay, other_relay))
+    return np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+
+def load_edges(path: str, number_of_relays: int) -> np.ndarray:
+    """
+
+    :param path: A text file with a channel in every line, as the indices of its two relays separated by whitespace.
+     Lines starting with # are ignored.
+    :param number_of_relays:
+    :return:
+    """
+    if path is None:
+        raise ValueError("An edge list topology needs a topology path")
+    edges = np.loadtxt(path, dtype=np.int64, comments='#', ndmin=2)[:, :2]
+    if np.any(edges < 0) or np.any(edges >= number_of_relays):
+        raise ValueError("The edge list has relays out of range: ", path)
+    return edges
+
+
+def create_adjacency(number_of_relays: int, edges: np.ndarray) -> Adjacency:
+    """
+
+    :param number_of_relays:
+    :param edges: Pairs of relays, in any direction, where loops and duplicates are dropped.
+    :return:
+    """
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    directed_edges = np.unique(np.concatenate((edges, edges[:, ::-1])), axis=0)
+    indptr = np.zeros(number_of_relays + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(directed_edges[:, 0], minlength=number_of_relays))
+    return indptr, directed_edges[:, 1].copy()
+
+
+def get_reverse_edges(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+
+    :param indptr:
+    :param indices:
+    :return: The index of the edge j -> i for every edge i -> j of a symmetric adjacency.
+    """
+    sources = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+    # Sorting the edges by (target, source) lists them in the order of their reverse edges.
+    reverse_edges = np.empty(len(indices), dtype=np.int64)
+    reverse_edges[np.lexsort((sources, indices))] = np.arange(len(indices))
+    return reverse_edges
@@ -0,0 +1,48 @@
+from typing import Dict, List
+import hashlib
+from LogNormal import LogNormal
+import numpy as np
+
+# Transaction samples each process already memory-mapped, by path.
+loaded_transaction_samples: Dict[str, np.ndarray] = dict()
+
+
+def create_transaction_samples(path: str, samples_count: int, transactions_num: int, seed: int = None) -> str:
+    """
+    Generate the transaction samples once into a .npy file, one row of transaction values per sample, so processes can
+    memory-map them instead of receiving copies.
+    :param path:
+    :param samples_count:
+    :param transactions_num:
+    :param seed: Seed of the samples, where each row is drawn from its own child seed, so a row doesn't depend on the
+     number of samples. Unseeded if None.
+    :return: The path of the samples file.
+    """
+    samples = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(samples_count, transactions_num))
+    for i in range(samples_count):
+        random_generator = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,)))
+        samples[i] = LogNormal(size=transactions_num, random_generator=random_generator).get_samples()
+    samples.flush()
+    del samples
+    return path
+
+
+def load_transaction_samples(path: str) -> np.ndarray:
+    """
+
+    :param path:
+    :return: Read-only memory-map of the transaction samples in path, shared by all the callers in the process.
+    """
+    if path not in loaded_transaction_samples:
+        loaded_transaction_samples[path] = np.load(path, mmap_mode='r')
+    return loaded_transaction_samples[path]
+
+
+def get_transaction_samples_hashes(path: str) -> List[str]:
+    """
+
+    :param path:
+    :return: A hash of every transaction sample in path, of its length and its values.
+    """
+    return [hashlib.sha256(str(len(sample)).encode('utf-8') + np.ascontiguousarray(sample).tobytes()).hexdigest()
+            for sample in load_transaction_samples(path)]
@@ -0,0 +1,281 @@
+from typing import List, Tuple, Any, Optional, Callable, Iterator, Dict
+import os
+import pickle
+import socket
+import time
+import uuid
+
+# The folders of the tasks in each state, in the directory of the queue.
+PENDING: str = 'pending'
+CLAIMED: str = 'claimed'
+DONE: str = 'done'
+FAILED: str = 'failed'
+STATES: Tuple[str, ...] = (PENDING, CLAIMED, DONE, FAILED)
+# The file whose existence tells the workers to exit.
+STOP_FILE_NAME: str = 'stop'
+# Seconds between two scans of the queue for tasks or results.
+POLL_INTERVAL: float = 0.5
+# Seconds between two renewals of the claim of a task by the worker running it, see renew.
+CLAIM_RENEWAL_INTERVAL: float = 10.
+
+
+class WorkQueue:
+    def __init__(self, directory: str):
+        """
+        Queue of tasks in a directory, which any number of processes, on any host which shares the directory, work on.
+        A task is a file which moves from the pending folder to the claimed folder when a worker claims it, and its
+        result is written to the done folder, or its traceback to the failed folder. Files are always written to a
+        temporary file first and renamed into place, and claiming is a rename too, which is atomic, so no two workers
+        claim the same task and no result is read half-written. The claimed file is named after the task and the
+        worker which owns the claim, and a claim is a lease which the worker renews by touching the file while it runs
+        the task. A task whose lease expires, since its worker died, is pending again, and its former owner can no
+        longer complete it.
+        :param directory:
+        """
+        self.directory: str = directory
+        for state in STATES:
+            os.makedirs(os.path.join(directory, state), exist_ok=True)
+        # The token of the claims of this instance, unique across the hosts and the processes sharing the directory.
+        self.owner: str = "{0}-{1}-{2}".format(socket.gethostname().replace('.', '-'), os.getpid(), uuid.uuid4().hex)
+        # The modification time of every claimed file this instance saw, with the time on this host it first saw it,
+        # see release_expired_claims.
+        self.claim_observations: Dict[str, Tuple[float, float]] = dict()
+
+    def get_path(self, state: str, key: str) -> str:
+        """
+
+        :param state: One of STATES.
+        :param key:
+        :return:
+        """
+        return os.path.join(self.directory, state, key + '.pickle')
+
+    def get_keys(self, state: str) -> List[str]:
+        """
+
+        :param state: One of STATES.
+        :return: The keys of the tasks in the state, without the files still being written. The keys of claimed tasks
+         are followed by the owners of their claims, see get_claim_path.
+        """
+        return sorted(name[:-len('.pickle')] for name in os.listdir(os.path.join(self.directory, state))
+                      if name.endswith('.pickle'))
+
+    def get_claim_path(self, key: str) -> str:
+        """
+
+        :param key:
+        :return: The path of the claim of this instance on the task.
+        """
+        return self.get_path(CLAIMED, key + '.' + self.owner)
+
+    @staticmethod
+    def write(path: str, content: Any):
+        """
+        Write content to path atomically.
+        :param path:
+        :param content:
+        :return:
+        """
+        temporary_path = "{0}.{1}.{2}.tmp".format(path, socket.gethostname(), os.getpid())
+        with open(temporary_path, 'wb') as temporary_file:
+            pickle.dump(content, temporary_file)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def read(path: str) -> Any:
+        """
+
+        :param path:
+        :return:
+        """
+        with open(path, 'rb') as content_file:
+            return pickle.load(content_file)
+
+    def start(self):
+        """
+        Clear the tasks and results of a previous sweep, and let workers run.
+        :return:
+        """
+        for state in STATES:
+            for key in self.get_keys(state):
+                os.remove(self.get_path(state, key))
+        if self.is_stopped():
+            os.remove(os.path.join(self.directory, STOP_FILE_NAME))
+        self.claim_observations.clear()
+
+    def stop(self):
+        """
+        Tell the workers to exit once they finish their current tasks.
+        :return:
+        """
+        open(os.path.join(self.directory, STOP_FILE_NAME), 'w').close()
+
+    def is_stopped(self) -> bool:
+        """
+
+        :return:
+        """
+        return os.path.exists(os.path.join(self.directory, STOP_FILE_NAME))
+
+    def put(self, key: str, task: Any):
+        """
+
+        :param key: A key which is unique to the task, which names its files, and has no dots.
+        :param task:
+        :return:
+        """
+        self.write(self.get_path(PENDING, key), task)
+
+    def claim(self) -> Optional[Tuple[str, Any]]:
+        """
+
+        :return: The key and the task of a pending task, which no other worker will claim, or None if there is none.
+        """
+        for key in self.get_keys(PENDING):
+            try:
+                # Read before the rename, since once the task is claimed its lease may expire at any time.
+                task = self.read(self.get_path(PENDING, key))
+                os.rename(self.get_path(PENDING, key), self.get_claim_path(key))
+            except FileNotFoundError:
+                # Another worker claimed it first.
+                continue
+            return key, task
+        return None
+
+    def renew(self, key: str):
+        """
+        Extend the lease of a claimed task, see release_expired_claims.
+        :param key: The key of a task this instance claimed.
+        :return:
+        """
+        try:
+            os.utime(self.get_claim_path(key))
+        except FileNotFoundError:
+            # The lease expired and the task is pending again.
+            pass
+
+    def release_expired_claims(self, lease_seconds: float) -> List[str]:
+        """
+        Move the claimed tasks whose leases weren't renewed for lease_seconds back to pending, so another worker runs
+        them. A lease is only timed by the clock of this host, from the first time this instance saw the current
+        modification time of the claimed file, so the clocks of the hosts and stale file attributes don't shorten it.
+        :param lease_seconds:
+        :return: The keys of the released tasks.
+        """
+        now: float = time.time()
+        claim_names: List[str] = self.get_keys(CLAIMED)
+        released_keys = list()
+        for claim_name in claim_names:
+            path = self.get_path(CLAIMED, claim_name)
+            try:
+                modification_time = os.path.getmtime(path)
+            except FileNotFoundError:
+                # The task was completed in the meantime.
+                continue
+            observation = self.claim_observations.get(claim_name)
+            if observation is None or observation[0] != modification_time:
+                self.claim_observations[claim_name] = (modification_time, now)
+                continue
+            if now - observation[1] <= lease_seconds:
+                continue
+
+            key: str = claim_name.split('.', 1)[0]
+            try:
+                os.rename(path, self.get_path(PENDING, key))
+            except FileNotFoundError:
+                continue
+            del self.claim_observations[claim_name]
+            released_keys.append(key)
+
+        # Forget the claims which are gone.
+        for claim_name in set(self.claim_observations) - set(claim_names):
+            del self.claim_observations[claim_name]
+        return released_keys
+
+    def is_claimed(self, key: str) -> bool:
+        """
+
+        :param key:
+        :return: Whether this instance still owns its claim on the task.
+        """
+        return os.path.exists(self.get_claim_path(key))
+
+    def complete(self, key: str, result: Any) -> bool:
+        """
+
+        :param key: The key of a task this instance claimed.
+        :param result:
+        :return: Whether the result was written, which it isn't if the claim expired, since the task is pending again or
+         claimed by another worker.
+        """
+        return self.finish(key, DONE, result)
+
+    def fail(self, key: str, error: str) -> bool:
+        """
+
+        :param key: The key of a task this instance claimed.
+        :param error: The traceback of the failure.
+        :return: See complete.
+        """
+        return self.finish(key, FAILED, error)
+
+    def finish(self, key: str, state: str, content: Any) -> bool:
+        """
+        Write the result or the failure of a claimed task, and remove the claim, only if this instance still owns it.
+        :param key: The key of a task this instance claimed.
+        :param state: DONE or FAILED.
+        :param content:
+        :return: See complete.
+        """
+        if not self.is_claimed(key):
+            return False
+        self.write(self.get_path(state, key), content)
+        try:
+            os.remove(self.get_claim_path(key))
+        except FileNotFoundError:
+            # The lease expired right after the check, so the task may run again, and its other result is ignored.
+            pass
+        return True
+
+    def pop(self, state: str) -> List[Tuple[str, Any]]:
+        """
+        Read and remove the results or the failures in the queue.
+        :param state: DONE or FAILED.
+        :return: The key of every task in the state, with its result or its traceback.
+        """
+        contents = list()
+        for key in self.get_keys(state):
+            contents.append((key, self.read(self.get_path(state, key))))
+            os.remove(self.get_path(state, key))
+        return contents
+
+    def execute(self, tasks: List[Any], get_key: Callable[[Any], str], lease_seconds: float,
+                are_workers_alive: Callable[[], bool] = None) -> Iterator[Tuple[Any, Any]]:
+        """
+        Put the tasks in the queue, and wait for the workers to run them.
+        :param tasks:
+        :param get_key: The key of a task, see put.
+        :param lease_seconds: See release_expired_claims.
+        :param are_workers_alive: Whether any of the workers which the caller depends on still runs, or None to wait for
+         workers indefinitely.
+        :return: Every task and its result, as soon as it's done.
+        """
+        remaining_tasks: Dict[str, Any] = {get_key(task): task for task in tasks}
+        for key, task in remaining_tasks.items():
+            self.put(key, task)
+
+        while remaining_tasks:
+            # Checked before reading the results, so the results of workers which exit in the meantime are still read.
+            is_any_worker_alive: bool = are_workers_alive is None or are_workers_alive()
+            failures = [(key, error) for key, error in self.pop(FAILED) if key in remaining_tasks]
+            if failures:
+                raise RuntimeError("A worker failed to run a task:\n" + failures[0][1])
+            results = [(key, result) for key, result in self.pop(DONE) if key in remaining_tasks]
+            for key, result in results:
+                yield remaining_tasks.pop(key), result
+            if results:
+                continue
+            if not is_any_worker_alive:
+                raise RuntimeError("All the workers exited with tasks remaining: ", len(remaining_tasks))
+            self.release_expired_claims(lease_seconds)
+            time.sleep(POLL_INTERVAL)
@@ -0,0 +1,270 @@
+from LightningNetwork import LightningNetworkConfiguration, LightningNetwork, create_lightning_network, ENGINES, \
+    ANALYTIC_ENGINE, EVENT_ENGINE
+from Simulation import calc_simulation_results
+from LogNormal import LogNormal
+from typing import List, Dict, Any, Callable, Tuple
+from itertools import product
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+
+# The grid of network parameters the hot paths are benchmarked on.
+BENCHMARK_RELAYS: List[int] = [50, 200]
+BENCHMARK_CLIENTS: List[int] = [1000, 10000]
+BENCHMARK_HOPS: List[int] = [3, 6]
+BENCHMARK_LIQUIDITY_ASSUMED: List[bool] = [False, True]
+
+BENCHMARK_TRANSACTIONS_NUM: int = 2000
+BENCHMARK_SEED: int = 0
+# The number of times every timing is measured, after a warm-up run, of which the median is reported.
+BENCHMARK_REPEATS: int = 5
+# The relative change of a metric, in its worse direction, which is reported as a regression, unless the spread of the
+# metric's measurements is larger.
+REGRESSION_THRESHOLD: float = 0.1
+
+# Metrics where higher is better, and metrics where lower is better.
+THROUGHPUT_METRICS: List[str] = ['find_path_per_second', 'verify_path_per_second', 'transact_per_second',
+                                 'simulation_transactions_per_second']
+COST_METRICS: List[str] = ['construction_seconds', 'construction_peak_bytes', 'simulation_peak_bytes']
+
+
+def create_benchmark_configuration(engine: str, number_of_relays: int, number_of_clients: int, hops_number: int,
+                                   is_liquidity_assumed: bool,
+                                   transaction_batch_size: int) -> LightningNetworkConfiguration:
+    """
+    Configurations like the ones of LiquidityAssumed and LiqudityNotAssumed.
+    :param engine:
+    :param number_of_relays:
+    :param number_of_clients:
+    :param hops_number:
+    :param is_liquidity_assumed:
+    :param transaction_batch_size:
+    :return:
+    """
+    return LightningNetworkConfiguration(
+        default_balance_client_relay_channel_client=0 if is_liquidity_assumed else float('inf'),
+        default_balance_client_relay_channel_relay=0 if is_liquidity_assumed else 10 ** 7,
+        default_balance_relay_relay_channel=0 if is_liquidity_assumed else 10 ** 7,
+        channel_cost=44 * (10 ** 3),
+        relay_transaction_fee=100 if is_liquidity_assumed else 0,
+        transaction_proportional_fee=0 if is_liquidity_assumed else 0.01,
+        hops_number=hops_number,
+        is_liquidity_assumed=is_liquidity_assumed,
+        add_fees_to_value=False,
+        number_of_relays=number_of_relays,
+        number_of_clients=number_of_clients,
+        number_of_relays_per_client=1,
+        engine=engine,
+        transaction_batch_size=transaction_batch_size
+    )
+
+
+def measure_peak_bytes(function: Callable[[], Any]) -> int:
+    """
+
+    :param function:
+    :return: The peak of the memory allocated while calling function, as traced by tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_per_second(count: int, function: Callable[[], Any], repeats: int, setup: Callable[[], Any] = None) \
+        -> Tuple[float, float]:
+    """
+    Call function once to warm up, and then time it repeats times.
+    :param count: The number of operations function performs.
+    :param function:
+    :param repeats:
+    :param setup: Called before every call of function, without being timed, e.g. to reset the state it changes.
+    :return: The median number of operations per second, and the spread of the measurements: their range relative to
+     the median.
+    """
+    if setup is not None:
+        setup()
+    function()
+    seconds: List[float] = timeit.repeat(function, setup=setup if setup is not None else 'pass', repeat=repeats,
+                                         number=1)
+    rates: List[float] = [count / duration for duration in seconds]
+    median_rate: float = statistics.median(rates)
+    return median_rate, (max(rates) - min(rates)) / median_rate
+
+
+def benchmark_configuration(configuration: LightningNetworkConfiguration, transactions_num: int, seed: int,
+                            repeats: int) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Time the construction of the network, find_path, verify_path and transact on it, and a whole simulation.
+    :param configuration:
+    :param transactions_num:
+    :param seed:
+    :param repeats: See BENCHMARK_REPEATS.
+    :return: The metrics of the configuration, and the spreads of the measurements of its timed metrics.
+    """
+    transaction_values: np.ndarray = LogNormal(size=transactions_num,
+                                               random_generator=np.random.default_rng(seed)).get_samples()
+    metrics: Dict[str, float] = dict()
+    spreads: Dict[str, float] = dict()
+
+    construction_per_second, spreads['construction_seconds'] = measure_per_second(
+        1, lambda: create_lightning_network(configuration, np.random.default_rng(seed)), repeats)
+    metrics['construction_seconds'] = 1 / construction_per_second
+    metrics['construction_peak_bytes'] = measure_peak_bytes(
+        lambda: create_lightning_network(configuration, np.random.default_rng(seed)))
+
+    lightning_network: LightningNetwork = create_lightning_network(configuration, np.random.default_rng(seed))
+    snapshot = lightning_network.snapshot()
+    client_pairs = [lightning_network.sample_client_pair() for _ in range(transactions_num)]
+    paths = [lightning_network.find_path(source_client, target_client) for source_client, target_client in client_pairs]
+
+    def reset_network():
+        # Every measurement starts from the same balances and randomness, so all of them do the same work.
+        lightning_network.restore(snapshot, np.random.default_rng(seed))
+
+    metrics['find_path_per_second'], spreads['find_path_per_second'] = measure_per_second(
+        transactions_num, lambda: [lightning_network.find_path(source_client, target_client)
+                                   for source_client, target_client in client_pairs], repeats, reset_network)
+    metrics['verify_path_per_second'], spreads['verify_path_per_second'] = measure_per_second(
+        transactions_num, lambda: [lightning_network.verify_path(path, value)
+                                   for path, value in zip(paths, transaction_values)], repeats, reset_network)
+    metrics['transact_per_second'], spreads['transact_per_second'] = measure_per_second(
+        transactions_num, lambda: [lightning_network.transact(source_client, target_client, value)
+                                   for (source_client, target_client), value in zip(client_pairs, transaction_values)],
+        repeats, reset_network)
+
+    metrics['simulation_transactions_per_second'], spreads['simulation_transactions_per_second'] = measure_per_second(
+        transactions_num, lambda: calc_simulation_results(configuration, transaction_values,
+                                                          random_generator=np.random.default_rng(seed)), repeats)
+    metrics['simulation_peak_bytes'] = measure_peak_bytes(
+        lambda: calc_simulation_results(configuration, transaction_values,
+                                        random_generator=np.random.default_rng(seed)))
+    return metrics, spreads
+
+
+def run_benchmarks(engines: List[str], transactions_num: int, transaction_batch_size: int, seed: int,
+                   repeats: int) -> Dict[str, Any]:
+    """
+
+    :param engines:
+    :param transactions_num:
+    :param transaction_batch_size:
+    :param seed:
+    :param repeats: See BENCHMARK_REPEATS.
+    :return: The benchmark report, with the parameters, the metrics and the spreads of every configuration of the grid.
+    """
+    cases: List[Dict[str, Any]] = list()
+    grid = product(engines, BENCHMARK_RELAYS, BENCHMARK_CLIENTS, BENCHMARK_HOPS, BENCHMARK_LIQUIDITY_ASSUMED)
+    for engine, number_of_relays, number_of_clients, hops_number, is_liquidity_assumed in grid:
+        if engine == ANALYTIC_ENGINE and not is_liquidity_assumed:
+            continue
+        if engine == EVENT_ENGINE and (is_liquidity_assumed or transaction_batch_size > 0):
+            continue
+        parameters = dict(engine=engine, number_of_relays=number_of_relays, number_of_clients=number_of_clients,
+                          hops_number=hops_number, is_liquidity_assumed=is_liquidity_assumed,
+                          transaction_batch_size=transaction_batch_size)
+        metrics, spreads = benchmark_configuration(create_benchmark_configuration(**parameters), transactions_num, seed,
+                                                   repeats)
+        cases.append(dict(parameters=parameters, metrics=metrics, spreads=spreads))
+        print(get_case_name(parameters) + ": " + ", ".join("{0}={1:.4g}".format(name, value)
+                                                           for name, value in metrics.items()))
+    return {
+        'environment': dict(python=platform.python_version(), numpy=np.__version__, machine=platform.machine(),
+                            processor=platform.processor()),
+        'transactions_num': transactions_num,
+        'seed': seed,
+        'repeats': repeats,
+        'cases': cases
+    }
+
+
+def get_case_name(parameters: Dict[str, Any]) -> str:
+    """
+
+    :param parameters:
+    :return:
+    """
+    return " ".join("{0}={1}".format(name, value) for name, value in sorted(parameters.items()))
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) \
+        -> List[Tuple[str, str, float, float]]:
+    """
+    Compare the metrics of the cases which are in both the report and the baseline. A metric only regresses when it
+    changes by more than threshold and by more than the spread of its measurements in either of them, so noise isn't
+    reported as a regression.
+    :param report:
+    :param baseline:
+    :param threshold: See REGRESSION_THRESHOLD.
+    :return: The case, metric, baseline value and report value of every regression.
+    """
+    baseline_cases = {get_case_name(case['parameters']): case for case in baseline['cases']}
+    regressions = list()
+    for case in report['cases']:
+        case_name = get_case_name(case['parameters'])
+        if case_name not in baseline_cases:
+            continue
+        baseline_case = baseline_cases[case_name]
+        for metric, value in case['metrics'].items():
+            baseline_value = baseline_case['metrics'].get(metric)
+            if not baseline_value:
+                continue
+            change = (value - baseline_value) / baseline_value
+            metric_threshold = max(threshold, case.get('spreads', dict()).get(metric, 0.),
+                                   baseline_case.get('spreads', dict()).get(metric, 0.))
+            if (metric in THROUGHPUT_METRICS and change < -metric_threshold) or \
+                    (metric in COST_METRICS and change > metric_threshold):
+                regressions.append((case_name, metric, baseline_value, value))
+    return regressions
+
+
+def main(arguments: List[str]) -> int:
+    """
+
+    :param arguments:
+    :return: The exit code, 1 if there are regressions compared to the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths across a grid of networks.")
+    parser.add_argument('--output', default=os.path.join('results', 'benchmark.json'),
+                        help="Path of the JSON report.")
+    parser.add_argument('--baseline', help="Path of a JSON report to compare against.")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative change of a metric which is a regression.")
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    parser.add_argument('--transactions', type=int, default=BENCHMARK_TRANSACTIONS_NUM)
+    parser.add_argument('--batch-size', type=int, default=0, help="See TRANSACTION_BATCH_SIZE.")
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS,
+                        help="Number of measurements of every timing, after a warm-up run.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    report = run_benchmarks(parsed_arguments.engines, parsed_arguments.transactions, parsed_arguments.batch_size,
+                            parsed_arguments.seed, parsed_arguments.repeats)
+    output_directory = os.path.dirname(parsed_arguments.output)
+    if output_directory:
+        os.makedirs(output_directory, exist_ok=True)
+    with open(parsed_arguments.output, 'w') as output_file:
+        json.dump(report, output_file, indent=4)
+    print("The report was written to " + parsed_arguments.output)
+
+    if parsed_arguments.baseline is None:
+        return 0
+    with open(parsed_arguments.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = find_regressions(report, baseline, parsed_arguments.threshold)
+    for case_name, metric, baseline_value, value in regressions:
+        print("Regression in {0}: {1} {2:.4g} -> {3:.4g}".format(case_name, metric, baseline_value, value))
+    print("{0} regressions compared to {1}".format(len(regressions), parsed_arguments.baseline))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,10 +1,17 @@
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
-from typing import List, Dict
+from typing import List
 import os
 import seaborn as sns
 import itertools
-import tikzplotlib as tikz
+# SimulationConfiguration used to be defined here, so the pickled data frames of older runs, whose columns are
+# configurations, reference it in this module.
+from SimulationConfiguration import SimulationConfiguration  # noqa: F401
+
+PNG_FORMAT: str = 'png'
+TEX_FORMAT: str = 'tex'
+PLOT_FORMATS: List[str] = [PNG_FORMAT, TEX_FORMAT]
 
 
 SMALL_SIZE = 14
@@ -20,46 +27,36 @@ plt.rc('legend', fontsize=SMALL_SIZE)    # legend font-size
 plt.rc('figure', titlesize=BIGGER_SIZE)  # font-size of the figure title
 
 
-class SimulationConfiguration:
-    def __init__(self, r2r_balance, r2c_balance, base_fee, proportional_fee):
-        self.r2r_balance = r2r_balance
-        self.r2c_balance = r2c_balance
-        self.base_fee = base_fee
-        self.proportional_fee = proportional_fee
-
-    def __hash__(self):
-        return hash((self.r2c_balance, self.r2c_balance, self.base_fee, self.proportional_fee))
-
-    def __eq__(self, other):
-        return (self.r2r_balance, self.r2c_balance, self.base_fee, self.proportional_fee) \
-               == (other.r2r_balance, other.r2c_balance, other.base_fee, other.proportional_fee)
-
-    def __ne__(self, other):
-        # Not strictly necessary, but to avoid having both x==y and x!=y
-        # True at the same time
-        return not (self == other)
-
-    def __str__(self):
-        return "{}%".format(self.proportional_fee * 100)
+def use_headless_backend():
+    """
+    Render figures with the non-interactive Agg backend, which needs no display and never blocks.
+    """
+    matplotlib.use('Agg')
 
 
-def store_results(results: Dict[SimulationConfiguration, List[float]], filepath, filename, csv=False) -> pd.DataFrame:
+def save_figure(plot_path, name, formats: List[str] = None, show: bool = False):
     """
-
-    :param csv:
-    :param filepath:
-    :param results:
-    :param filename:
+    Save the current figure in each of the formats, and close it.
+    :param plot_path:
+    :param name:
+    :param formats: Formats of PLOT_FORMATS, all of them if None.
+    :param show: Whether to also show the figure, which blocks until it is closed.
     :return:
     """
-    df = pd.DataFrame.from_dict(results)
-    if not os.path.exists(filepath):
-        os.mkdir(filepath)
-    if csv:
-        df.to_csv(os.path.join(filepath, filename + '.csv'), index=False)
-    else:
-        df.to_pickle(os.path.join(filepath, filename + '.pickle'))
-    return df
+    if formats is None:
+        formats = PLOT_FORMATS
+    for plot_format in formats:
+        if plot_format not in PLOT_FORMATS:
+            raise ValueError("Unknown plot format {0}, expected one of {1}".format(plot_format, PLOT_FORMATS))
+    if PNG_FORMAT in formats:
+        plt.savefig(fname=os.path.join(plot_path, name + '.png'))
+    if TEX_FORMAT in formats:
+        # Imported here since the export is slow to import, and only needed for TeX outputs.
+        import tikzplotlib as tikz
+        tikz.save(os.path.join(plot_path, name + '.tex'), encoding='utf-8')
+    if show:
+        plt.show()
+    plt.close('all')
 
 
 def plot_graphs(dfs,
@@ -67,7 +64,9 @@ def plot_graphs(dfs,
                 ylabels: List[str] = None,
                 titles: List[str] = None,
                 plot_names: List[str] = None,
-                subtitles: List[str] = None):
+                subtitles: List[str] = None,
+                formats: List[str] = None,
+                show: bool = False):
     """
 
     :param dfs:
@@ -75,6 +74,8 @@ def plot_graphs(dfs,
     :param ylabels:
     :param titles:
     :param plot_names:
+    :param formats: See save_figure.
+    :param show: See save_figure.
     :return:
     """
     if type(dfs) is not list:
@@ -96,13 +97,11 @@ def plot_graphs(dfs,
         plt.title(title + "\n" + subtitle, fontsize=20)
         plt.ylabel(ylabel)
         plt.xlabel('Transaction Number')
-        plt.savefig(fname=os.path.join(plot_path, name + '.png'))
-        tikz.save(os.path.join(plot_path, name + '.tex'), encoding='utf-8')
-        plt.show()
-    plt.close('all')
+        save_figure(plot_path, name, formats, show)
 
 
-def plot_histogram(df: pd.DataFrame, plot_path, title, name, labels, subtitle):
+def plot_histogram(df: pd.DataFrame, plot_path, title, name, labels, subtitle, formats: List[str] = None,
+                   show: bool = False):
     """
 
     :param df:
@@ -111,6 +110,8 @@ def plot_histogram(df: pd.DataFrame, plot_path, title, name, labels, subtitle):
     :param name:
     :param labels:
     :param plot:
+    :param formats: See save_figure.
+    :param show: See save_figure.
     :return:
     """
     df.plot.bar(figsize=(20, 10))\
@@ -119,14 +120,11 @@ def plot_histogram(df: pd.DataFrame, plot_path, title, name, labels, subtitle):
     plt.xlabel(labels[0])
     plt.ylabel(labels[1])
     plt.title(title + "\n" + subtitle, fontsize=20)
-    plt.savefig(fname=os.path.join(plot_path, name + '.png'))
-    tikz.save(os.path.join(plot_path, name + '.tex'), encoding='utf-8')
-    plt.show()
+    save_figure(plot_path, name, formats, show)
 
-    plt.close('all')
 
-
-def plot_freq(df: pd.DataFrame, plot_path, title, name, labels, subtitle):
+def plot_freq(df: pd.DataFrame, plot_path, title, name, labels, subtitle, formats: List[str] = None,
+              show: bool = False):
     """
 
     :param df:
@@ -135,6 +133,8 @@ def plot_freq(df: pd.DataFrame, plot_path, title, name, labels, subtitle):
     :param name:
     :param labels:
     :param plot:
+    :param formats: See save_figure.
+    :param show: See save_figure.
     :return:
     """
     df_columns: List[pd.DataFrame] = [df[[column]] for column in df]
@@ -148,8 +148,5 @@ def plot_freq(df: pd.DataFrame, plot_path, title, name, labels, subtitle):
                      hist_kws={"rwidth": 0.75, 'edgecolor': 'black', 'alpha': 1.0})
     fig.legend(title='proportional fee:', labels=[str(label_name) for label_name in df.columns],
                loc="upper left", frameon=True, framealpha=0.7, ncol=1, shadow=False, borderpad=1)
-    plt.savefig(fname=os.path.join(plot_path, name + '.png'))
-    tikz.save(os.path.join(plot_path, name + '.tex'), encoding='utf-8')
-    plt.show()
-    plt.close('all')
+    save_figure(plot_path, name, formats, show)
 
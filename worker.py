@@ -0,0 +1,79 @@
+from Simulation import run_simulation_task
+from WorkQueue import WorkQueue, POLL_INTERVAL, CLAIM_RENEWAL_INTERVAL
+from typing import List
+import argparse
+import sys
+import threading
+import time
+import traceback
+
+
+def renew_claim(work_queue: WorkQueue, key: str, is_done: threading.Event):
+    """
+    Renew the lease of a claimed task every CLAIM_RENEWAL_INTERVAL seconds until is_done is set.
+    :param work_queue:
+    :param key:
+    :param is_done:
+    :return:
+    """
+    while not is_done.wait(CLAIM_RENEWAL_INTERVAL):
+        work_queue.renew(key)
+
+
+def run_worker(directory: str, wait: bool, poll_interval: float) -> int:
+    """
+    Claim the tasks of the work queue and run them, one after the other, until the queue is stopped.
+    :param directory: See WorkQueue.
+    :param wait: Whether to wait for more tasks when there are no pending tasks, instead of exiting.
+    :param poll_interval: Seconds to wait before looking for pending tasks again.
+    :return: The number of tasks the worker completed.
+    """
+    work_queue: WorkQueue = WorkQueue(directory)
+    completed_count: int = 0
+    while not work_queue.is_stopped():
+        claimed_task = work_queue.claim()
+        if claimed_task is None:
+            if not wait:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        key, task = claimed_task
+        is_done = threading.Event()
+        renewal_thread = threading.Thread(target=renew_claim, args=(work_queue, key, is_done), daemon=True)
+        renewal_thread.start()
+        try:
+            repetition_result = run_simulation_task(task)[1]
+        except Exception:
+            work_queue.fail(key, traceback.format_exc())
+            continue
+        finally:
+            is_done.set()
+            renewal_thread.join()
+        # The result of a task whose claim expired is dropped, since another worker runs it again.
+        if work_queue.complete(key, repetition_result):
+            completed_count += 1
+    return completed_count
+
+
+def main(arguments: List[str]) -> int:
+    """
+
+    :param arguments:
+    :return: The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Run the simulation tasks of a sweep's work queue.")
+    parser.add_argument('directory', help="The directory of the work queue, see WORK_QUEUE_DIRECTORY.")
+    parser.add_argument('--wait', action='store_true',
+                        help="Wait for more tasks until the sweep stops the queue, instead of exiting once it's empty.")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help="Seconds between two looks for pending tasks.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    completed_count = run_worker(parsed_arguments.directory, parsed_arguments.wait, parsed_arguments.poll_interval)
+    print("The worker completed {0} tasks".format(completed_count))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))